@@ -1,5 +1,9 @@
 import streamlit as st
 
+from core.loader import base_exists
+from ui.export import export_all_button
+from ui.warmup import start_prewarm
+
 # -------------------------------------------------------------
 # CONFIGURAÇÃO INICIAL DO APP
 # -------------------------------------------------------------
@@ -9,6 +13,10 @@ st.set_page_config(
     layout="wide",
 )
 
+# lê a base e calcula as seções em segundo plano enquanto a apresentação é lida
+if base_exists():
+    start_prewarm()
+
 # -------------------------------------------------------------
 # CABEÇALHO
 # -------------------------------------------------------------
@@ -93,6 +101,9 @@ st.info("""
 💡 Dica: use a barra lateral do app para navegar entre as seções do estudo.
 """)
 
+if base_exists():
+    export_all_button()
+
 # -------------------------------------------------------------
 # RODAPÉ
 # -------------------------------------------------------------
@@ -0,0 +1,49 @@
+# benchmarks/bench_memory.py
+"""Memória da base normalizada: layout compacto (core.compact) vs. o anterior.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --base "planilhas/*.xlsx"
+    python benchmarks/bench_memory.py --rows 1m
+
+Sem --rows, mede a base configurada (BANCO_PATH); com --rows, uma aba
+sintética de bench_pages.make_banco com essa quantidade de linhas. O layout
+anterior é o de antes da compactação: textos como str e códigos Int64.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from core import loader  # noqa: E402
+from core.compact import expanded_frame, memory_report  # noqa: E402
+
+
+def synthetic_banco(rows: int) -> pd.DataFrame:
+    from bench_pages import make_banco
+
+    return loader.normalize_banco(loader.promote_header(make_banco(rows)))
+
+
+def main():
+    from bench_pages import parse_scale
+
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--base", default=str(loader.FILE_PATH), help="planilha, diretório ou padrão glob (padrão: BANCO_PATH)")
+    ap.add_argument("--aba", default=loader.SHEET_NAME, help="aba com a base (padrão: Banco)")
+    ap.add_argument("--rows", default=None, help="usa uma base sintética com essa quantidade de linhas, ex.: 1m")
+    args = ap.parse_args()
+
+    df = synthetic_banco(parse_scale(args.rows)) if args.rows else loader.load_banco(args.base, args.aba)
+    # layout anterior: textos como str e códigos Int64 (Unidade já era categórica)
+    before = expanded_frame(df, loader.TEXT_COLUMNS, loader.CODE_COLUMNS)
+    report = memory_report(before, df)
+    print(f"{len(df):,} linhas".replace(",", "."))
+    with pd.option_context("display.width", 160, "display.max_rows", None):
+        print(report.to_string(float_format=lambda v: f"{v:.1f}"))
+
+
+if __name__ == "__main__":
+    main()
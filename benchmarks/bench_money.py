@@ -0,0 +1,164 @@
+# benchmarks/bench_money.py
+"""Benchmark: core.money.parse_brl vs. os conversores antigos das páginas.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/bench_money.py --rows 1000000
+
+Os conversores antigos estão copiados abaixo como estavam nas páginas, só
+para comparação.
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from core.money import parse_brl  # noqa: E402
+
+
+# ---------- conversores antigos ----------
+def to_num(series):  # páginas 1 e 2
+    s = series.astype(str).fillna("").str.strip().replace(r"^\s*$", "", regex=True)
+    s = s.str.replace(r"[Rr]\$\s*", "", regex=True).str.replace(r"[^\d,.\-]", "", regex=True)
+
+    def conv(x):
+        if x == "" or pd.isna(x):
+            return pd.NA
+        if x.count(",") > 0 and x.count(".") == 0:
+            x = x.replace(".", "").replace(",", ".")
+        elif x.count(".") > 1:
+            x = x.replace(".", "")
+        try:
+            return float(x)
+        except:
+            return pd.NA
+    return s.map(conv)
+
+
+def to_numeric_col(s):  # página 4
+    def conv(x):
+        if pd.isna(x):
+            return 0.0
+        if isinstance(x, (int, float, np.number)):
+            return float(x)
+        x = str(x).strip()
+        x = x.replace("R$", "").replace(" ", "")
+        if x.count(",") > 0 and x.count(".") > 0:
+            x = x.replace(".", "").replace(",", ".")
+        else:
+            if x.count(",") > 0 and x.count(".") == 0:
+                x = x.replace(",", ".")
+            if x.count(".") > 0 and x.count(",") == 0:
+                x = x.replace(".", "")
+        try:
+            return float(x)
+        except:
+            try:
+                return float(x.replace(",", "."))
+            except:
+                return 0.0
+    return s.apply(conv)
+
+
+def to_numeric(col):  # página 5
+    s = col.astype(str).fillna("").str.strip()
+    s = s.str.replace(r"[R$\s]", "", regex=True)
+    has_point = s.str.contains(r"\.").any()
+    has_comma = s.str.contains(r",").any()
+    if has_point and has_comma:
+        s = s.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    else:
+        s = s.str.replace(",", ".", regex=False)
+    s = s.replace("", np.nan)
+    return pd.to_numeric(s, errors="coerce")
+
+
+def br_to_float(s):  # página 3
+    if s is None:
+        return np.nan
+    s = str(s).strip()
+    if s in ("", "-", "—"):
+        return np.nan
+    s = re.sub(r"R\$\s*", "", s)
+    s = s.replace(".", "").replace(",", ".")
+    try:
+        return float(s)
+    except:
+        return np.nan
+
+
+def parse_brl_legacy(s):  # página 6
+    if s is None:
+        return np.nan
+    s = str(s).strip()
+    if s == "-" or s == "":
+        return np.nan
+    neg = False
+    if s.startswith("(") and s.endswith(")"):
+        neg = True
+        s = s[1:-1]
+    s = re.sub(r"[^\d\.,\-]", "", s)
+    if s.count("-") > 0:
+        s = s.replace("-", "")
+        neg = True
+    s = s.replace(".", "").replace(",", ".")
+    try:
+        v = float(s)
+    except:
+        v = np.nan
+    return -v if neg and not np.isnan(v) else v
+
+
+# ---------- dados ----------
+def brl(v: float) -> str:
+    s = f"{abs(v):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return f"(R$ {s})" if v < 0 else f"R$ {s}"
+
+
+def make_column(rows: int, distinct: int, seed: int = 42) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    pool = rng.lognormal(mean=9.0, sigma=2.0, size=distinct).round(2)
+    pool[rng.random(distinct) < 0.05] *= -1
+    texts = np.array([brl(v) for v in pool], dtype=object)
+    texts[rng.random(distinct) < 0.02] = "-"
+    return pd.Series(texts[rng.integers(0, distinct, size=rows)], dtype=object)
+
+
+def timed(fn, col, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(col)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--distinct", type=int, default=None, help="valores distintos (padrão: rows // 2)")
+    ap.add_argument("--repeat", type=int, default=1)
+    args = ap.parse_args()
+
+    col = make_column(args.rows, args.distinct or max(1, args.rows // 2))
+    candidates = {
+        "parse_brl (core.money)": parse_brl,
+        "to_num (páginas 1/2)": to_num,
+        "to_numeric_col (página 4)": to_numeric_col,
+        "to_numeric (página 5)": to_numeric,
+        "br_to_float (página 3)": lambda c: c.map(br_to_float),
+        "parse_brl (página 6)": lambda c: c.apply(parse_brl_legacy),
+    }
+    results = {name: timed(fn, col, args.repeat) for name, fn in candidates.items()}
+    base = results["parse_brl (core.money)"]
+    print(f"{args.rows:,} linhas".replace(",", "."))
+    for name, secs in results.items():
+        print(f"{name:<28} {secs:8.3f} s   {secs / base:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+# benchmarks/bench_pages.py
+"""Benchmark das etapas de cada página sobre uma aba "Banco" sintética.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/bench_pages.py --scales 10k,1m,10m
+    python benchmarks/bench_pages.py --scales 10k --xlsx --render
+    python benchmarks/bench_pages.py --compare antes.json depois.json
+
+Para cada escala é gerada uma base com as filiais, os Ajustes de Conta e as
+contas dos grupos 81/83/84, valores mistos (números e textos "R$ 1.234,56")
+e cabeçalho precedido de linhas vazias, com rótulos de tipos mistos (datas nos
+meses, espaços e caixa variada nos nomes). Etapas medidas (tempo e pico de
+memória via tracemalloc, numa segunda execução da etapa):
+
+    base     load, columns, parse_money, consolidate, cube (comuns às páginas)
+    páginas  aggregate, format e, com --render, a página inteira via AppTest
+
+Sem --xlsx a etapa load parte da aba já em memória (como o read_excel sem
+cabeçalho devolveria); com --xlsx a base é gravada em .xlsx (até o limite de
+linhas do Excel) e load lê o arquivo. A escala 10m precisa de vários GB de RAM.
+O resultado vai para um JSON (--out), comparável com outro via --compare.
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import core.loader as loader  # noqa: E402
+import core.snapshot as snapshot  # noqa: E402
+from core.consolidate import extract_codes, unit_column  # noqa: E402
+from core.analytics import (  # noqa: E402
+    LINE_ORDER, area_split, cost_ranking, efficiency_scores, freight_plan, monthly_tables, monthly_trends,
+    yoy_comparison,
+)
+from core.cube import FRETE_GROUP, build_cube  # noqa: E402
+from core.formatting import brl as format_brl  # noqa: E402
+from core.ingest import read_banco_stream  # noqa: E402
+from core.money import parse_brl  # noqa: E402
+
+EXCEL_MAX_ROWS = 1_048_576
+BLANK_ROWS = 2
+FILIAIS = [
+    (20, "Parauapebas"), (25, "São Luis"), (28, "São Paulo ( Industrial )"), (30, "Bahia"),
+    (31, "Imperatriz"), (73, "Ananindeua"), (80, "São Paulo ( Medicinal )"), (93, "Pernambuco"),
+]
+GROUPS = {81: "RH", 83: "Manutenção", 84: "Frete"}
+GROUP_SHARE = [0.34, 0.18, 0.48]
+DESCRIPTIONS = {
+    81: ["Ordenados", "Horas Extras", "Férias", "13o Salario", "Encargos Sociais"],
+    83: ["Manutencao Veiculos", "Pecas e Acessorios", "Pneus", "Servicos de Terceiros"],
+    84: ["Para Vendas", "Frete Variavel Vendas", "Para Transferencias", "Pedagio s/frete",
+         "Fretes Extraordinários", "Outros Transportes", "Transportes Offshore"],
+}
+SUFFIXES = ["", " Distribuicao Gasosa", " DG Contagem", " DG Sert", " DG Camp", " Distrib."]
+DIST_CENTERS = range(30, 40)  # centros de custo da área de distribuição
+MONTHS = [datetime(y, m, 1) for y in (2017, 2018) for m in range(1, 6)]
+HEADER = (["Conta Contábil ", "Filial", "Atividade", "Centro de custo", "Descricao"] + MONTHS
+          + ["Ajuste Conta", " NOME FILIAL", "Valores", "Apenas Frete", "Apenas_Distribuicao",
+             "Total 2017", "Total 2018"])
+PAGES = ["1_ranking", "2_representatividade", "3_mensal", "4_anual", "5_eficiencia", "6_plano"]
+PAGE_FILES = {
+    "1_ranking": "1_Ranking_Custos.py", "2_representatividade": "2_Representatividade_Custos.py",
+    "3_mensal": "3_Analise_Mensal.py", "4_anual": "4_Analise_Anual.py",
+    "5_eficiencia": "5_Eficiencia_Filiais.py", "6_plano": "6_Plano_de_Ação.py",
+}
+
+
+# ---------- dados ----------
+def parse_scale(text: str) -> int:
+    text = text.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * mult)
+
+
+def brl(v: float) -> str:
+    if v == 0:
+        return "-"
+    s = f"{abs(v):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return f"(R$ {s})" if v < 0 else f"R$ {s}"
+
+
+def make_banco(rows: int, text_share: float = 0.3, seed: int = 42) -> pd.DataFrame:
+    """Aba "Banco" sintética como o read_excel sem cabeçalho devolveria (linhas vazias + cabeçalho + dados)."""
+    rng = np.random.default_rng(seed)
+    group = rng.choice(list(GROUPS), size=rows, p=GROUP_SHARE)
+    filial = rng.integers(0, len(FILIAIS), size=rows)
+    center = rng.integers(1, 60, size=rows)
+
+    # valores mensais tirados de um conjunto de valores distintos (formatados uma vez só)
+    pool = rng.lognormal(mean=9.0, sigma=1.5, size=min(rows * 4, 200_000)).round(2)
+    pool[rng.random(pool.size) < 0.05] = 0.0
+    pool_text = np.array([brl(v) for v in pool], dtype=object)
+    idx = rng.integers(0, pool.size, size=(rows, len(MONTHS)))
+    values = pool[idx]
+
+    data = {
+        0: group * 100 + rng.integers(1, 20, size=rows),
+        1: np.array([c for c, _ in FILIAIS])[filial],
+        2: np.full(rows, "1       ", dtype=object),
+        3: center,
+    }
+    desc = np.empty(rows, dtype=object)
+    for g, names in DESCRIPTIONS.items():
+        options = np.array([n + s for n in names for s in SUFFIXES], dtype=object)
+        hit = group == g
+        desc[hit] = options[rng.integers(0, options.size, size=int(hit.sum()))]
+    data[4] = desc
+    for j in range(len(MONTHS)):
+        col = values[:, j].astype(object)
+        text = rng.random(rows) < text_share
+        col[text] = pool_text[idx[text, j]]
+        data[5 + j] = col
+    k = 5 + len(MONTHS)
+    frete = group == FRETE_GROUP
+    data[k] = np.array(list(GROUPS.values()), dtype=object)[np.searchsorted(list(GROUPS), group)]
+    data[k + 1] = np.array([n for _, n in FILIAIS], dtype=object)[filial]
+    data[k + 2] = values.sum(axis=1).round(2)
+    data[k + 3] = np.where(frete, values[:, 1:].sum(axis=1).round(2), np.nan)
+    data[k + 4] = np.where(np.isin(center, DIST_CENTERS), "Distribuição", "Outras Areas").astype(object)
+    data[k + 5] = values[:, :5].sum(axis=1).round(2)
+    data[k + 6] = values[:, 5:].sum(axis=1).round(2)
+
+    head = pd.DataFrame([[None] * len(HEADER)] * BLANK_ROWS + [HEADER], dtype=object)
+    return pd.concat([head, pd.DataFrame(data, dtype=object)], ignore_index=True)
+
+
+def write_xlsx(raw: pd.DataFrame, path: Path) -> None:
+    """Grava a aba em .xlsx (openpyxl write-only)."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(loader.SHEET_NAME)
+    for row in raw.itertuples(index=False, name=None):
+        ws.append([None if isinstance(v, float) and np.isnan(v) else v for v in row])
+    wb.save(path)
+
+
+# ---------- medição ----------
+class Recorder:
+    def __init__(self, memory: bool):
+        self.memory = memory
+        self.results = []
+
+    def run(self, scale: int, page: str, stage: str, fn, memory: bool = True):
+        t0 = time.perf_counter()
+        out = fn()
+        secs = time.perf_counter() - t0
+        peak = None
+        if self.memory and memory:
+            # o tracemalloc deixa a etapa bem mais lenta: o pico sai de uma segunda execução
+            tracemalloc.start()
+            fn()
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+        size = len(out) if hasattr(out, "__len__") else None
+        self.results.append({"scale": scale, "page": page, "stage": stage, "seconds": round(secs, 6),
+                             "peak_mb": None if peak is None else round(peak, 2), "rows_out": size})
+        mem = "" if peak is None else f"{peak:10.1f} MB"
+        print(f"{scale:>12,} {page:<22} {stage:<14} {secs:10.3f} s {mem}".replace(",", "."))
+        return out
+
+
+# ---------- etapas comuns ----------
+def project_columns(df: pd.DataFrame) -> pd.DataFrame:
+    rename = loader.resolve_columns(df.columns)
+    out = df[list(rename)].rename(columns=rename)
+    for c in loader.TEXT_COLUMNS:
+        if c in out:
+            out[c] = out[c].where(out[c].isna(), out[c].astype(str).str.strip())
+    return out
+
+
+def parse_money(df: pd.DataFrame) -> pd.DataFrame:
+    cols = [c for c in loader.MONEY_COLUMNS + loader.month_columns(df) if c in df]
+    return df.assign(**{c: parse_brl(df[c]) for c in cols})
+
+
+def consolidate(df: pd.DataFrame) -> pd.DataFrame:
+    codes = {c: extract_codes(df[c]) for c in loader.CODE_COLUMNS if c in df}
+    out = df.assign(**codes)
+    out["Unidade"] = unit_column(out["Nome Filial"], out.get("Filial"))
+    return out
+
+
+# ---------- agregações das páginas (as mesmas funções de core.analytics que as páginas usam) ----------
+def page_mensal(df, cube):
+    tables = monthly_tables(cube, True)
+    trends = {g: monthly_trends(t) for g, t in tables.items()}
+    return pd.concat(tables, names=["Grupo"]).join(pd.concat(trends, names=["Grupo"])[["pct", "slope"]])
+
+
+def page_anual(df, cube):
+    return pd.concat([yoy_comparison(cube, "Nome Filial"), yoy_comparison(cube, "Ajuste Conta")])
+
+
+AGGREGATES = dict(zip(PAGES, [
+    lambda df, cube: cost_ranking(cube),
+    lambda df, cube: area_split(cube, order=LINE_ORDER),
+    page_mensal,
+    page_anual,
+    lambda df, cube: efficiency_scores(cube),
+    lambda df, cube: freight_plan(df, cube).lines,
+]))
+
+
+def format_table(table: pd.DataFrame) -> pd.DataFrame:
+    """Formatação R$ das colunas numéricas, como as páginas fazem na exibição."""
+    out = table.copy()
+    for c in out.columns:
+        if pd.api.types.is_float_dtype(out[c]):
+            out[c] = format_brl(out[c])
+    return out
+
+
+def render_page(page: str):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(ROOT / "pages" / PAGE_FILES[page]), default_timeout=3600)
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].message}")
+    return at.main
+
+
+# ---------- execução ----------
+def bench_scale(rec: Recorder, scale: int, args, workdir: Path) -> None:
+    raw = make_banco(scale, args.text_share)
+    xlsx = None
+    if args.xlsx:
+        if scale + BLANK_ROWS + 1 > EXCEL_MAX_ROWS:
+            print(f"{scale:,} linhas não cabem em uma aba do Excel; load parte da memória.".replace(",", "."))
+        else:
+            xlsx = workdir / f"banco_{scale}.xlsx"
+            write_xlsx(raw, xlsx)
+
+    if xlsx is not None:
+        sheet = rec.run(scale, "base", "load", lambda: loader.read_sheet(xlsx))
+        rec.run(scale, "base", "load_stream", lambda: read_banco_stream(xlsx))
+    else:
+        sheet = rec.run(scale, "base", "load", lambda: loader.promote_header(raw))
+    df = rec.run(scale, "base", "columns", lambda: project_columns(sheet))
+    df = rec.run(scale, "base", "parse_money", lambda: parse_money(df))
+    df = rec.run(scale, "base", "consolidate", lambda: consolidate(df))
+    cube = rec.run(scale, "base", "cube", lambda: build_cube(df))
+
+    for page, aggregate in AGGREGATES.items():
+        table = rec.run(scale, page, "aggregate", lambda: aggregate(df, cube))
+        rec.run(scale, page, "format", lambda: format_table(table))
+
+    if args.render and xlsx is not None:
+        loader.FILE_PATH = xlsx
+        # load_banco guarda a base em cache: a segunda execução não mediria nada
+        rec.run(scale, "base", "load_app", lambda: loader.load_banco(xlsx), memory=False)
+        for page in PAGES:
+            rec.run(scale, page, "render", lambda: render_page(page))
+
+
+def compare(old_path: str, new_path: str) -> None:
+    def index(path):
+        with open(path, encoding="utf-8") as f:
+            return {(r["scale"], r["page"], r["stage"]): r for r in json.load(f)["results"]}
+
+    old, new = index(old_path), index(new_path)
+    print(f"{'escala':>12} {'página':<22} {'etapa':<14} {'antes':>10} {'depois':>10} {'razão':>7}")
+    for key in sorted(old.keys() & new.keys()):
+        a, b = old[key]["seconds"], new[key]["seconds"]
+        ratio = f"{a / b:6.1f}x" if b else "     -"
+        print(f"{key[0]:>12,} {key[1]:<22} {key[2]:<14} {a:10.3f} {b:10.3f} {ratio}".replace(",", "."))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--scales", default="10k,1m,10m", help="linhas por escala, ex.: 10k,1m,10m")
+    ap.add_argument("--text-share", type=float, default=0.3, help="fração das células mensais em texto R$")
+    ap.add_argument("--xlsx", action="store_true", help="grava e lê a base em .xlsx")
+    ap.add_argument("--render", action="store_true", help="roda cada página via AppTest (requer --xlsx)")
+    ap.add_argument("--no-memory", action="store_true", help="não mede pico de memória (tracemalloc)")
+    ap.add_argument("--out", default=None, help="arquivo JSON (padrão: benchmarks/results/pages-<data>.json)")
+    ap.add_argument("--compare", nargs=2, metavar=("ANTES", "DEPOIS"), help="compara dois JSONs e sai")
+    args = ap.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    rec = Recorder(memory=not args.no_memory)
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot.SNAPSHOT_DIR = Path(tmp) / "snapshots"  # não mistura com os snapshots do app
+        for scale in map(parse_scale, args.scales.split(",")):
+            bench_scale(rec, scale, args, Path(tmp))
+
+    out = Path(args.out) if args.out else ROOT / "benchmarks" / "results" / f"pages-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    meta = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "platform": platform.platform(),
+        "pandas": pd.__version__, "numpy": np.__version__,
+        "text_share": args.text_share, "xlsx": args.xlsx, "memory": rec.memory,
+    }
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": rec.results}, f, ensure_ascii=False, indent=2)
+    print(f"resultados: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_trend.py
+"""Benchmark: core.trend.batch_trends vs. iterrows + np.polyfit por linha.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/bench_trend.py --series 1000 --months 24
+
+O cálculo antigo da página 3 (trend_summary/label_trend) está copiado abaixo
+só para comparação.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from core.trend import batch_trends  # noqa: E402
+
+
+# ---------- cálculo antigo (página 3) ----------
+def trend_summary(values):
+    vals = np.array(values, dtype=float)
+    mask = ~np.isnan(vals)
+    if mask.sum() < 2:
+        return {"pct": np.nan, "slope": 0.0}
+    x = np.arange(len(vals))
+    coeffs = np.polyfit(x[mask], vals[mask], 1)
+    slope = float(coeffs[0])
+    first = vals[mask][0]
+    last = vals[mask][-1]
+    pct = (last - first) / first * 100 if first != 0 else np.nan
+    return {"pct": pct, "slope": slope}
+
+
+def label_trend(pct, slope):
+    if np.isnan(pct):
+        return "Indeterminado"
+    if pct > 8 or slope > 0:
+        return f"Crescimento forte ({pct:.1f}%)"
+    if pct > 3 or slope > 0:
+        return f"Crescimento moderado ({pct:.1f}%)"
+    if pct >= -3 and pct <= 3:
+        return f"Estável ({pct:.1f}%)"
+    if pct < -8 or slope < 0:
+        return f"Queda forte ({pct:.1f}%)"
+    return f"Queda moderada ({pct:.1f}%)"
+
+
+def legacy_trends(df):
+    metrics = []
+    for label, row in df.iterrows():
+        tr = trend_summary(row.tolist())
+        metrics.append({"label": label, "pct": tr["pct"], "slope": tr["slope"],
+                        "label_short": label_trend(tr["pct"], tr["slope"])})
+    return pd.DataFrame(metrics).set_index("label")
+
+
+# ---------- dados ----------
+def make_matrix(series: int, months: int, missing: float, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    base = rng.lognormal(mean=11.0, sigma=1.0, size=(series, 1))
+    drift = rng.normal(0.0, 0.02, size=(series, 1)) * np.arange(months)
+    values = base * (1 + drift + rng.normal(0.0, 0.1, size=(series, months)))
+    values[rng.random(values.shape) < missing] = np.nan
+    return pd.DataFrame(values, index=[f"serie {i}" for i in range(series)])
+
+
+def timed(fn, df, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(df)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--series", type=int, default=1000, help="linhas (filial × grupo × conta)")
+    ap.add_argument("--months", type=int, default=24)
+    ap.add_argument("--missing", type=float, default=0.1, help="fração de meses sem valor")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    df = make_matrix(args.series, args.months, args.missing)
+    batch = timed(batch_trends, df, args.repeat)
+    legacy = timed(legacy_trends, df, 1)
+    print(f"{args.series:,} séries × {args.months} meses".replace(",", "."))
+    print(f"{'batch_trends (core.trend)':<28} {batch * 1000:9.1f} ms")
+    print(f"{'iterrows + polyfit':<28} {legacy * 1000:9.1f} ms   {legacy / batch:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""Núcleo compartilhado do dashboard de custos (leitura e preparo da base)."""
+from core.loader import FILE_PATH, SHEET_NAME, dataset_version, load_banco, month_columns, versioned
+
+__all__ = ["FILE_PATH", "SHEET_NAME", "dataset_version", "load_banco", "month_columns", "versioned"]
@@ -0,0 +1,365 @@
+# core/analytics.py
+"""Cálculos das seis páginas como funções puras (sem Streamlit).
+
+Todas recebem o cubo de custos (core.cube.build_cube/get_cube) e, no caso do
+plano de frete, também a base normalizada. Devolvem DataFrames numéricos; a
+formatação R$ e os textos ficam nas páginas. run_all calcula todas as análises
+a partir de uma única leitura da base e um único cubo (usado por core.report).
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from core.cube import FRETE_GROUP, by_year, freight_breakdown, get_cube, monthly_matrices, rollup
+from core.loader import SHEET_NAME, load_banco, versioned
+from core.trend import batch_trends
+
+YEARS = ["Total 2017", "Total 2018"]
+LINE_ORDER = ["Frete", "Manutenção", "RH"]
+NO_LINE = "Sem Ajuste"      # rótulo das células sem 'Ajuste Conta' na página 2
+MATERIALITY_PCT = 5.0       # variação % mínima para sinalizar
+MATERIALITY_ABS = 50000.0   # variação mínima em R$ para sinalizar
+EFFICIENCY_WEIGHTS = (0.60, 0.30, 0.10)  # custo 2018, melhoria ano a ano, participação da distribuição
+
+
+# ---------- 1. ranking ----------
+def cost_ranking(cube: pd.DataFrame, status: str = None) -> pd.DataFrame:
+    """Unidades do maior para o menor custo total: Ranking, Nome Filial, custo_total, custo_frete (grupo 84).
+
+    status filtra Apenas_Distribuicao (None = todos).
+    """
+    filters = {} if status is None else {"Apenas_Distribuicao": status}
+    agg = pd.DataFrame({
+        "custo_total": rollup(cube, "Unidade", **filters),
+        "custo_frete": rollup(cube, "Unidade", Grupo=FRETE_GROUP, **filters),
+    }).rename_axis("Nome Filial").reset_index().fillna(0.0)
+    agg = agg.sort_values("custo_total", ascending=False).reset_index(drop=True)
+    agg.index += 1
+    agg["Ranking"] = agg.index
+    return agg[["Ranking", "Nome Filial", "custo_total", "custo_frete"]]
+
+
+# ---------- 2. representatividade ----------
+def area_totals(cube: pd.DataFrame) -> pd.DataFrame:
+    """Custo da Distribuição, das Outras Áreas e Total Geral: colunas Valor e Participação (fração do total)."""
+    total = float(cube["Valor"].sum())
+    distribution = float(rollup(cube, "Distribuicao").get(True, 0.0))
+    out = pd.DataFrame({"Valor": [distribution, total - distribution, total]},
+                       index=["Distribuição", "Outras Áreas", "Total Geral"])
+    out["Participação"] = out["Valor"] / total if total else np.nan
+    return out
+
+
+def area_split(cube: pd.DataFrame, by: str = "Ajuste Conta", order=None) -> pd.DataFrame:
+    """Valores por `by` em colunas Distribuição, Outras Áreas e Total Geral.
+
+    order: valores que vêm primeiro (sem diferenciar maiúsculas), o resto na ordem do cubo.
+    Células com `by` vazio entram como NO_LINE, para que o Total Geral feche
+    com o custo total da empresa.
+    """
+    wide = rollup(cube, [by, "Distribuicao"], dropna=False).unstack("Distribuicao", fill_value=0.0)
+    index = wide.index.astype(object)
+    wide.index = index.where(index.notna(), NO_LINE).rename(index.name)
+    out = pd.DataFrame({
+        "Distribuição": wide.get(True, 0.0),
+        "Outras Áreas": wide.get(False, 0.0),
+    }, index=wide.index)
+    out["Total Geral"] = out["Distribuição"] + out["Outras Áreas"]
+    if order:
+        present = {str(v).strip().lower(): v for v in out.index}
+        first = [present[k] for k in (str(o).strip().lower() for o in order) if k in present]
+        out = out.reindex(first + [v for v in out.index if v not in first]).fillna(0.0)
+    return out
+
+
+def freight_shares(cube: pd.DataFrame) -> pd.Series:
+    """Frete (grupo 84) da distribuição sobre o custo total da empresa e sobre o frete de todas as áreas."""
+    total = float(cube["Valor"].sum())
+    by_area = rollup(cube, "Distribuicao", Grupo=FRETE_GROUP)
+    freight_total = float(by_area.sum())
+    freight_distribution = float(by_area.get(True, 0.0))
+    return pd.Series({
+        "Frete Distribuição": freight_distribution,
+        "Frete Total": freight_total,
+        "Sobre o custo total": freight_distribution / total if total else np.nan,
+        "Sobre o frete total": freight_distribution / freight_total if freight_total else np.nan,
+    })
+
+
+# ---------- 3. mensal ----------
+def pivot_layout(matrix: pd.DataFrame) -> pd.DataFrame:
+    """Matriz filial × mês -> layout da dinâmica: coluna Total, ordenada, linha Total Geral.
+
+    Meses zerados contam como sem lançamento (o '-' da dinâmica no Excel).
+    """
+    t = matrix.mask(matrix == 0)
+    t["Total"] = t.sum(axis=1)
+    t = t.sort_values("Total", ascending=False)
+    t.loc["Total Geral"] = t.sum()
+    return t
+
+
+def monthly_tables(cube: pd.DataFrame, distribution=True) -> dict:
+    """{Ajuste Conta: tabela filial × mês no layout da dinâmica} (distribution como em monthly_matrices)."""
+    return {group: pivot_layout(m) for group, m in monthly_matrices(cube, distribution).items()}
+
+
+def monthly_trends(table: pd.DataFrame) -> pd.DataFrame:
+    """Tendência de cada linha de uma tabela de monthly_tables (pct, slope, n_meses, label_short)."""
+    return batch_trends(table.drop(columns="Total"))
+
+
+# ---------- 4. anual (YTD) ----------
+def filter_cube(cube: pd.DataFrame, status: str = None, filiais=None) -> pd.DataFrame:
+    """Células do cubo de um status de Apenas_Distribuicao e/ou de uma lista de filiais (None = todos)."""
+    mask = pd.Series(True, index=cube.index)
+    if filiais is not None:
+        mask &= cube["Nome Filial"].astype(str).isin(filiais)
+    if status is not None:
+        mask &= cube["Apenas_Distribuicao"].astype(str) == status
+    return cube[mask]
+
+
+def yoy_comparison(cube: pd.DataFrame, by: str) -> pd.DataFrame:
+    """Acumulado 2017 × 2018 por `by`: Total 2017, Total 2018, Delta Absoluto e Delta %, do maior 2018 para o menor."""
+    return yoy_table(by_year(cube, by))
+
+
+def yoy_table(wide: pd.DataFrame) -> pd.DataFrame:
+    """yoy_comparison a partir dos totais já somados (índice = dimensão, colunas 'Total <ano>')."""
+    out = wide.reindex(columns=YEARS, fill_value=0.0).reset_index()
+    out["Delta Absoluto"] = out["Total 2018"] - out["Total 2017"]
+    out["Delta %"] = yoy_pct(out["Total 2017"], out["Total 2018"])
+    return out.sort_values("Total 2018", ascending=False).reset_index(drop=True)
+
+
+class FilialContributions(NamedTuple):
+    by_filial: pd.DataFrame   # Nome Filial × 'Total <ano>' (só filiais com lançamento no status)
+    by_line: pd.DataFrame     # Nome Filial × (Ajuste Conta, 'Total <ano>' em centavos | 'n' células)
+
+
+def filial_contributions(cube: pd.DataFrame, status: str = None) -> FilialContributions:
+    """Contribuição de cada filial para os agregados da página 4, calculada uma vez por status.
+
+    Com ela, os agregados de qualquer conjunto de filiais saem somando linhas
+    (SelectionTotals) em vez de refiltrar e reagrupar o cubo. Os valores por
+    linha ficam em centavos inteiros para que somar e subtrair seja exato.
+    """
+    c = filter_cube(cube, status)
+    by_filial = by_year(c, "Nome Filial")
+    cents = np.rint(by_year(c, ["Nome Filial", "Ajuste Conta"]).reindex(columns=YEARS, fill_value=0.0) * 100).astype("int64")
+    cents["n"] = c.groupby(["Nome Filial", "Ajuste Conta"], observed=True).size()
+    by_line = cents.unstack("Ajuste Conta", fill_value=0).swaplevel(axis=1)
+    return FilialContributions(by_filial, by_line.reindex(by_filial.index, fill_value=0))
+
+
+def line_totals(totals: pd.Series) -> pd.DataFrame:
+    """Soma das contribuições por linha (SelectionTotals.update) -> Ajuste Conta × 'Total <ano>' em R$."""
+    wide = totals.unstack(level=1)
+    wide = wide[wide["n"] > 0]
+    return (wide[YEARS] / 100).astype(float).rename_axis("Ajuste Conta")
+
+
+class SelectionTotals:
+    """Soma das linhas de `vectors` (inteiros) das filiais selecionadas, atualizada pela diferença.
+
+    Marcar ou desmarcar uma filial soma ou subtrai só a contribuição dela:
+    cada interação custa O(filiais alteradas × colunas), não O(células do cubo).
+    """
+
+    def __init__(self, vectors: pd.DataFrame):
+        self.columns = vectors.columns
+        self._values = vectors.to_numpy(dtype="int64")
+        self._pos = {str(f): i for i, f in enumerate(vectors.index)}
+        self.selected = frozenset()
+        self._total = np.zeros(self._values.shape[1], dtype="int64")
+
+    def update(self, selected) -> pd.Series:
+        """Totais para a nova seleção (filiais fora de `vectors` são ignoradas)."""
+        selected = frozenset(str(f) for f in selected if str(f) in self._pos)
+        added, removed = selected - self.selected, self.selected - selected
+        if len(added) + len(removed) > len(selected):
+            # mudou mais do que sobrou: somar a seleção do zero é mais barato
+            self._total = self._values[[self._pos[f] for f in selected]].sum(axis=0, dtype="int64")
+        else:
+            for f in added:
+                self._total += self._values[self._pos[f]]
+            for f in removed:
+                self._total -= self._values[self._pos[f]]
+        self.selected = selected
+        return pd.Series(self._total.copy(), index=self.columns)
+
+
+def yoy_pct(old, new):
+    """Variação % de old para new sobre |old| (NaN quando old é zero)."""
+    old = np.asarray(old, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct = np.where(old == 0, np.nan, (np.asarray(new, dtype=float) - old) / np.abs(old) * 100)
+    return pct if pct.ndim else float(pct)
+
+
+def material(table: pd.DataFrame, pct: float = MATERIALITY_PCT, abs_value: float = MATERIALITY_ABS) -> pd.Series:
+    """True nas linhas de yoy_comparison com |Delta %| ou |Delta Absoluto| acima da materialidade."""
+    return (table["Delta %"].abs() >= pct) | (table["Delta Absoluto"].abs() >= abs_value)
+
+
+# ---------- 5. eficiência ----------
+def min_max_norm(s: pd.Series) -> pd.Series:
+    if s.max() == s.min():
+        return pd.Series(0.0, index=s.index)
+    return (s - s.min()) / (s.max() - s.min())
+
+
+def efficiency_scores(cube: pd.DataFrame, weights=EFFICIENCY_WEIGHTS) -> pd.DataFrame:
+    """Score de eficiência por filial (menor = mais eficiente), em ordem crescente de score.
+
+    Combina o custo total de 2018, a melhoria sobre 2017 e a participação da
+    distribuição em 2018, cada um normalizado entre as filiais.
+    """
+    return score_efficiency(efficiency_inputs(cube), weights)
+
+
+def efficiency_inputs(cube: pd.DataFrame) -> pd.DataFrame:
+    """Vetores por filial que alimentam o score: Nome Filial, Total_2017, Total_2018, Apenas_Distribuicao_2018."""
+    years = by_year(cube, "Nome Filial")
+    if not set(YEARS) <= set(years.columns):
+        raise ValueError("Não encontrei valores de 2017 e/ou 2018. Verifique os nomes na planilha.")
+    return pd.DataFrame({
+        "Total_2017": years["Total 2017"],
+        "Total_2018": years["Total 2018"],
+        "Apenas_Distribuicao_2018": rollup(cube, "Nome Filial", Distribuicao=True, Ano=2018),
+    }).fillna(0.0).rename_axis("Nome Filial").reset_index()
+
+
+def score_efficiency(inputs: pd.DataFrame, weights=EFFICIENCY_WEIGHTS) -> pd.DataFrame:
+    """Razões, normalizações min-max e score a partir de efficiency_inputs (O(filiais), sem o cubo)."""
+    agg = inputs.copy()
+    agg["Delta_Abs"] = agg["Total_2018"] - agg["Total_2017"]
+    agg["Delta_Pct"] = np.where(agg["Total_2017"] == 0, np.nan,
+                                (agg["Total_2018"] - agg["Total_2017"]) / agg["Total_2017"] * 100)
+    agg["Distrib_Share"] = np.where(agg["Total_2018"] == 0, 0.0,
+                                    agg["Apenas_Distribuicao_2018"] / agg["Total_2018"])
+    agg["total2018_norm"] = min_max_norm(agg["Total_2018"])
+    agg["improvement"] = np.where(agg["Total_2017"] == 0, 0.0,
+                                  (agg["Total_2017"] - agg["Total_2018"]) / agg["Total_2017"])
+    agg["improvement_norm"] = min_max_norm(agg["improvement"])
+    agg["dist_share_norm"] = min_max_norm(agg["Distrib_Share"])
+
+    agg["Efficiency_Score"] = efficiency_components(agg).to_numpy() @ np.asarray(weights, dtype=float)
+    return agg.sort_values("Efficiency_Score").reset_index(drop=True)
+
+
+# ---------- 5. sensibilidade dos pesos (what-if) ----------
+# componentes do score, na ordem de EFFICIENCY_WEIGHTS (todos: maior = pior)
+COMPONENTS = ["total2018_norm", "improvement_gap_norm", "dist_share_norm"]
+WEIGHT_GRID_STEP = 0.05
+
+
+def efficiency_components(scored: pd.DataFrame) -> pd.DataFrame:
+    """Matriz filial × componente normalizado (colunas COMPONENTS): score = componentes @ pesos."""
+    return pd.DataFrame({
+        "total2018_norm": scored["total2018_norm"].to_numpy(dtype=float),
+        "improvement_gap_norm": 1 - scored["improvement_norm"].to_numpy(dtype=float),
+        "dist_share_norm": scored["dist_share_norm"].to_numpy(dtype=float),
+    }, index=pd.Index(scored["Nome Filial"], name="Nome Filial"))
+
+
+def normalize_weights(weights) -> np.ndarray:
+    """Pesos (um conjunto ou uma matriz com um por linha) não negativos, reescalados para somar 1."""
+    w = np.asarray(weights, dtype=float)
+    total = w.sum(axis=-1, keepdims=True)
+    if (w < 0).any() or (total <= 0).any():
+        raise ValueError("Os pesos precisam ser não negativos e somar mais que zero.")
+    return w / total
+
+
+def weight_grid(step: float = WEIGHT_GRID_STEP) -> np.ndarray:
+    """Todas as combinações de pesos múltiplos de `step` que somam 1 (uma por linha)."""
+    n = int(round(1 / step))
+    i, j = np.meshgrid(np.arange(n + 1), np.arange(n + 1), indexing="ij")
+    keep = i + j <= n
+    return np.column_stack([i[keep], j[keep], n - i[keep] - j[keep]]) / n
+
+
+def _ranks(scores: np.ndarray) -> np.ndarray:
+    """Posição (1 = menor score) de cada filial, por coluna de `scores` (filiais × cenários)."""
+    order = np.argsort(scores, axis=0, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, scores.shape[0] + 1)[:, None], axis=0)
+    return ranks
+
+
+def weighted_ranking(components: pd.DataFrame, weights) -> pd.DataFrame:
+    """Score e Rank de todas as filiais com outros pesos (um produto matriz × vetor), do mais eficiente ao menos."""
+    scores = components.to_numpy() @ normalize_weights(weights)
+    out = pd.DataFrame({"Nome Filial": components.index, "Score": scores, "Rank": _ranks(scores[:, None])[:, 0]})
+    return out.sort_values("Rank").reset_index(drop=True)
+
+
+def rank_stability(components: pd.DataFrame, weights=EFFICIENCY_WEIGHTS, grid=None, top: int = 5) -> pd.DataFrame:
+    """Quanto o rank de cada filial varia em uma grade de pesos (todos os cenários num só produto de matrizes).
+
+    Colunas: Nome Filial, Rank (pesos atuais), Melhor rank, Pior rank, Amplitude,
+    Rank mediano e '% no top <top>' (fração dos cenários da grade), na ordem do rank atual.
+    """
+    grid = weight_grid() if grid is None else normalize_weights(np.atleast_2d(grid))
+    ranks = _ranks(components.to_numpy() @ grid.T)   # filiais × cenários
+    current = _ranks((components.to_numpy() @ normalize_weights(weights))[:, None])[:, 0]
+    out = pd.DataFrame({
+        "Nome Filial": components.index,
+        "Rank (pesos atuais)": current,
+        "Melhor rank": ranks.min(axis=1),
+        "Pior rank": ranks.max(axis=1),
+        "Amplitude": ranks.max(axis=1) - ranks.min(axis=1),
+        "Rank mediano": np.median(ranks, axis=1),
+        f"% no top {top}": (ranks <= top).mean(axis=1) * 100,
+    })
+    return out.sort_values("Rank (pesos atuais)").reset_index(drop=True)
+
+
+# ---------- 6. plano de ação (frete) ----------
+class FreightPlan(NamedTuple):
+    lines: pd.DataFrame   # Linha, Total 2017, Total 2018, Total Geral (maior Total Geral primeiro)
+    total: float          # frete da distribuição (2017 + 2018)
+    share_pct: float      # % do frete sobre o custo total da distribuição
+
+
+def freight_plan(df: pd.DataFrame, cube: pd.DataFrame) -> FreightPlan:
+    """Linhas de frete (grupo 84) da distribuição e o peso do frete no custo da distribuição."""
+    lines = freight_breakdown(df, True).rename_axis("Linha").reset_index()
+    lines["Linha"] = lines["Linha"].astype(object)
+    for col in YEARS:
+        if col not in lines.columns:
+            lines[col] = 0.0
+    total = lines["Total Geral"].sum()
+    distribution = rollup(cube, "Distribuicao").get(True, 0.0)
+    return FreightPlan(lines, total, total / distribution * 100 if distribution else np.nan)
+
+
+@versioned
+def current_freight_plan(path, sheet: str = SHEET_NAME) -> FreightPlan:
+    """freight_plan da versão atual da base (uma passada nas linhas por versão)."""
+    return freight_plan(load_banco(path, sheet), get_cube(path=path, sheet=sheet))
+
+
+# ---------- todas de uma vez ----------
+def run_all(df: pd.DataFrame, cube: pd.DataFrame) -> dict:
+    """{nome: DataFrame} com as tabelas das seis análises, a partir da mesma base e do mesmo cubo."""
+    monthly = {}
+    for group, table in monthly_tables(cube, True).items():
+        trends = monthly_trends(table)[["pct", "slope", "label_short"]]
+        monthly[group] = table.join(trends.rename(columns={"pct": "Variação %", "slope": "Inclinação",
+                                                           "label_short": "Tendência"}))
+    plan = freight_plan(df, cube)
+    return {
+        "1_ranking_custos": cost_ranking(cube).set_index("Ranking"),
+        "2_representatividade_areas": area_totals(cube),
+        "2_representatividade_linhas": area_split(cube, order=LINE_ORDER),
+        "2_representatividade_frete": freight_shares(cube).to_frame("Valor"),
+        "3_analise_mensal": pd.concat(monthly, names=["Grupo", "Nome Filial"]),
+        "4_anual_filial": yoy_comparison(cube, "Nome Filial").assign(Material=lambda t: material(t)),
+        "4_anual_linha": yoy_comparison(cube, "Ajuste Conta").assign(Material=lambda t: material(t)),
+        "5_eficiencia": efficiency_scores(cube),
+        "6_plano_frete": plan.lines.assign(**{"% do Total Frete": plan.lines["Total Geral"] / plan.total * 100}),
+    }
@@ -0,0 +1,76 @@
+# core/compact.py
+"""Representação compacta da base em memória e relatório de uso de memória.
+
+A base normalizada fica em cache no processo e cada cálculo derivado (cubo,
+filtros, exportações) herda os tipos dela; com muitas sessões em um servidor
+pequeno, o layout das colunas pesa. compact_frame deixa:
+
+    dimensões de texto     categóricas: dicionário de valores distintos + códigos
+                           int8/int16 por linha (Apenas_Distribuicao, com dois
+                           valores, vira na prática um flag de 1 byte)
+    códigos numéricos      menor inteiro anulável que comporta (Int16/Int32)
+    valores R$ e meses     float64 contíguos (centavos exatos; não reduzidos)
+
+memory_report compara o layout compacto com o anterior (expanded_frame); o
+relatório da base atual sai de benchmarks/bench_memory.py.
+"""
+import numpy as np
+import pandas as pd
+
+INT_TYPES = ["Int8", "Int16", "Int32", "Int64"]
+
+
+def smallest_int(s: pd.Series) -> pd.Series:
+    """Inteiro anulável mais estreito que comporta os valores da coluna."""
+    values = s.dropna()
+    if values.empty:
+        return s.astype("Int8")
+    lo, hi = int(values.min()), int(values.max())
+    for dtype in INT_TYPES:
+        info = np.iinfo(dtype.lower())
+        if info.min <= lo and hi <= info.max:
+            return s.astype(dtype)
+    return s
+
+
+def compact_frame(df: pd.DataFrame, categories=(), codes=()) -> pd.DataFrame:
+    """Categóricas para `categories` e inteiro mais estreito para `codes` (colunas ausentes são ignoradas).
+
+    Também serve para recompactar após pd.concat, que devolve object/str quando
+    os dicionários das partes diferem.
+    """
+    for c in categories:
+        if c in df and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype("category")
+    for c in codes:
+        if c in df:
+            df[c] = smallest_int(df[c])
+    return df
+
+
+def expanded_frame(df: pd.DataFrame, categories=(), codes=()) -> pd.DataFrame:
+    """Layout sem compactação (textos como str, códigos Int64), para comparação."""
+    out = df.copy()
+    for c in categories:
+        if c in out and isinstance(out[c].dtype, pd.CategoricalDtype):
+            out[c] = out[c].astype(out[c].cat.categories.dtype)
+    for c in codes:
+        if c in out:
+            out[c] = out[c].astype("Int64")
+    return out
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Bytes por coluna (memory_usage deep) nos dois layouts, com a linha Total."""
+    b = before.memory_usage(deep=True, index=False)
+    a = after.memory_usage(deep=True, index=False)
+    out = pd.DataFrame({
+        "Tipo anterior": before.dtypes.astype(str),
+        "Bytes anterior": b,
+        "Tipo compacto": after.dtypes.astype(str),
+        "Bytes compacto": a,
+    })
+    out.loc["Total"] = ["", b.sum(), "", a.sum()]
+    out["Redução %"] = (1 - out["Bytes compacto"] / out["Bytes anterior"].where(out["Bytes anterior"] > 0)) * 100
+    return out
+
@@ -0,0 +1,67 @@
+# core/consolidate.py
+"""Consolidação de filiais em unidades de análise.
+
+A unidade de São Paulo é composta de dois códigos de filial (28 Industrial e
+80 Medicinal). Em vez de percorrer as linhas com apply, os códigos são
+extraídos com uma única passada de regex vetorizada e a tabela de
+consolidação é aplicada apenas sobre os valores distintos; o resultado volta
+para as linhas por indexação e sai como coluna categórica.
+"""
+import numpy as np
+import pandas as pd
+
+# código da filial -> unidade consolidada (filiais fora da tabela mantêm o nome)
+UNIT_MAP = {
+    28: "São Paulo",
+    80: "São Paulo",
+}
+# nomes que também indicam a unidade consolidada (quando o código não vem na base)
+UNIT_NAME_PATTERNS = {
+    r"\b(?:sao ?paulo|s\.? ?paulo)\b": "São Paulo",
+}
+CODE_PATTERN = r"^\s*(\d{1,6})\b"
+
+
+def extract_codes(series: pd.Series) -> pd.Series:
+    """Extrai o código numérico inicial (ex.: '8401 - Frete' -> 8401) como Int64."""
+    s = series.astype("string").str.extract(CODE_PATTERN, expand=False)
+    return pd.to_numeric(s, errors="coerce").astype("Int64")
+
+
+def _expand(values: np.ndarray, idx: np.ndarray, na) -> np.ndarray:
+    """Leva valores calculados por item distinto de volta às linhas (índice -1 = ausente)."""
+    return np.append(values, np.array([na], dtype=values.dtype))[idx]
+
+
+def unit_column(names: pd.Series, codes: pd.Series = None, mapping: dict = None,
+                name_patterns: dict = None) -> pd.Series:
+    """Coluna categórica 'Unidade' a partir do nome e (opcionalmente) do código da filial.
+
+    Código efetivo = código informado ou, na falta dele, o número no início do
+    nome. Se o código estiver em `mapping`, a unidade é o valor mapeado; senão,
+    se o nome casar com `name_patterns`, a unidade do padrão; senão o próprio nome.
+    """
+    mapping = UNIT_MAP if mapping is None else mapping
+    name_patterns = UNIT_NAME_PATTERNS if name_patterns is None else name_patterns
+
+    # tudo o que depende só do nome é calculado uma vez por nome distinto
+    name_idx, name_uniques = pd.factorize(names.astype("string").str.strip())
+    uniq = pd.Series(name_uniques, dtype="string")
+    uniq_codes = extract_codes(uniq).to_numpy(dtype="float64", na_value=np.nan)
+    uniq_units = uniq.to_numpy(dtype=object, na_value=None)
+    for pattern, unit in name_patterns.items():
+        hit = uniq.str.contains(pattern, case=False, regex=True).to_numpy(dtype=bool, na_value=False)
+        uniq_units = np.where(hit, unit, uniq_units)
+
+    row_units = _expand(uniq_units, name_idx, None)
+    row_codes = _expand(uniq_codes, name_idx, np.nan)
+    if codes is not None:
+        given = pd.to_numeric(codes, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        row_codes = np.where(np.isnan(given), row_codes, given)
+
+    # tabela de consolidação aplicada sobre os códigos distintos
+    code_idx, code_uniques = pd.factorize(row_codes)
+    mapped = np.array([mapping.get(int(c)) for c in code_uniques], dtype=object)
+    row_mapped = _expand(mapped, code_idx, None)
+    units = np.where(pd.isna(row_mapped), row_units, row_mapped)
+    return pd.Series(pd.Categorical(units), index=names.index, name="Unidade")
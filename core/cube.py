@@ -0,0 +1,167 @@
+# core/cube.py
+"""Cubo de custos pré-agregado, compartilhado pelas páginas.
+
+Cada página agrupava as linhas da base por conta própria. O cubo soma os
+valores uma única vez por versão da base nas dimensões usadas pelo dashboard:
+
+    Unidade × Nome Filial × Ajuste Conta × Apenas_Distribuicao × Grupo × Período
+
+(Distribuicao e Ano são atributos derivados de Apenas_Distribuicao e Período.)
+As tabelas das páginas saem de roll-ups do cubo, que tem uma fração das
+linhas da base. Quando a nova versão da base é a anterior + linhas
+acrescentadas (core.loader.banco_refresh), só as linhas novas são agregadas
+e somadas ao cubo anterior.
+"""
+import numpy as np
+import pandas as pd
+
+from core.loader import SHEET_NAME, banco_refresh, load_banco, month_columns, versioned
+from core.profiling import profiled
+
+CATEGORY_DIMENSIONS = ["Unidade", "Nome Filial", "Ajuste Conta", "Apenas_Distribuicao"]
+DIMENSIONS = ["Unidade", "Nome Filial", "Ajuste Conta", "Apenas_Distribuicao", "Grupo", "Período"]
+DISTRIBUTION_VALUES = ("1", "true", "t", "sim", "s", "yes", "y", "x")
+FRETE_GROUP = 84
+
+
+def distribution_flag(values: pd.Series) -> pd.Series:
+    """True quando o campo 'Apenas_Distribuicao' indica distribuição (avaliado por valor distinto)."""
+    idx, uniques = pd.factorize(values)
+    labels = pd.Series(uniques, dtype=object).astype(str).str.strip().str.lower()
+    flags = (labels.isin(DISTRIBUTION_VALUES) | labels.str.contains("distrib", regex=False)).to_numpy(dtype=bool)
+    return pd.Series(np.append(flags, False)[idx], index=values.index, name="Distribuicao")
+
+
+def account_group(codes: pd.Series) -> pd.Series:
+    """Grupo da conta contábil = dois primeiros dígitos do código (8401 -> 84)."""
+    head = codes.astype("string").str[:2]
+    return pd.to_numeric(head, errors="coerce").astype("Int64")
+
+
+def _periods(df: pd.DataFrame) -> dict:
+    """Coluna de valor -> rótulo do período; meses quando existem, senão os totais anuais."""
+    months = month_columns(df)
+    if months:
+        return {m: m for m in months}
+    totals = {c: c.split()[-1] for c in ("Total 2017", "Total 2018") if c in df}
+    return totals or {"Valores": "Total"}
+
+
+@profiled("cubo")
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """Soma os valores da base nas dimensões do cubo (uma linha por combinação presente)."""
+    periods = _periods(df)
+    dims = pd.DataFrame({
+        "Unidade": df["Unidade"],
+        "Nome Filial": df["Nome Filial"],
+        "Ajuste Conta": df["Ajuste Conta"] if "Ajuste Conta" in df else pd.Series(np.nan, index=df.index, dtype=object),
+        "Apenas_Distribuicao": df["Apenas_Distribuicao"] if "Apenas_Distribuicao" in df else pd.Series(np.nan, index=df.index, dtype=object),
+        "Grupo": account_group(df["Conta Contábil"]) if "Conta Contábil" in df else pd.Series(pd.NA, index=df.index, dtype="Int64"),
+    })
+    for c in CATEGORY_DIMENSIONS:
+        dims[c] = dims[c].astype("category")
+
+    values = df[list(periods)].rename(columns=periods)
+    long = pd.concat([dims, values], axis=1).melt(
+        id_vars=list(dims.columns), var_name="Período", value_name="Valor"
+    )
+    return _aggregate(long)
+
+
+@profiled("cubo (incremental)")
+def fold_cube(cube: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """Soma ao cubo as células de um cubo parcial (ex.: o das linhas acrescentadas)."""
+    both = pd.concat([cube[DIMENSIONS + ["Valor"]], delta[DIMENSIONS + ["Valor"]]], ignore_index=True)
+    for c in CATEGORY_DIMENSIONS:
+        both[c] = both[c].astype("category")
+    return _aggregate(both)
+
+
+def _aggregate(cells: pd.DataFrame) -> pd.DataFrame:
+    cube = (
+        cells.groupby(DIMENSIONS, observed=True, dropna=False, sort=False)["Valor"]
+        .sum(min_count=1)  # célula sem lançamento fica NaN (distinto de zero)
+        .reset_index()
+    )
+    cube["Distribuicao"] = distribution_flag(cube["Apenas_Distribuicao"])
+    cube["Ano"] = pd.to_numeric(cube["Período"].astype(str).str[:4], errors="coerce").astype("Int64")
+    return cube
+
+
+def rollup(cube: pd.DataFrame, by, *, min_count: int = 0, dropna: bool = True, **filters) -> pd.Series:
+    """Soma de 'Valor' agrupada por `by`, após filtros coluna=valor (ou lista de valores).
+
+    min_count=1 mantém NaN nos grupos sem nenhum lançamento (padrão: 0,0);
+    dropna=False mantém as células com `by` vazio em um grupo NaN.
+    """
+    c = cube
+    for col, val in filters.items():
+        c = c[c[col].isin(val)] if isinstance(val, (list, tuple, set, frozenset)) else c[c[col] == val]
+    return c.groupby(by, observed=True, dropna=dropna)["Valor"].sum(min_count=min_count)
+
+
+def by_year(cube: pd.DataFrame, by, **filters) -> pd.DataFrame:
+    """Roll-up em formato largo, uma coluna 'Total <ano>' por ano do cubo."""
+    by = [by] if isinstance(by, str) else list(by)
+    wide = rollup(cube, by + ["Ano"], **filters).unstack("Ano", fill_value=0.0)
+    wide.columns = [f"Total {a}" for a in wide.columns]
+    return wide
+
+
+# (caminho, aba) -> (marca d'água da base, cubo) do último cubo construído
+_LAST_CUBE = {}
+
+
+@versioned
+def get_cube(path, sheet: str = SHEET_NAME) -> pd.DataFrame:
+    """Cubo da versão atual da base, construído uma vez por versão (não alterar in-place).
+
+    Se a versão atual é a anterior + linhas acrescentadas, agrega só essas
+    linhas e soma ao cubo anterior.
+    """
+    step = banco_refresh(path, sheet)
+    last = _LAST_CUBE.get((path, sheet))
+    if step.rows is not None and last is not None and last[0] == step.base:
+        cube = fold_cube(last[1], build_cube(step.rows))
+    else:
+        cube = build_cube(load_banco(path, sheet))
+    if step.mark is not None:
+        _LAST_CUBE[(path, sheet)] = (step.mark, cube)
+    return cube
+
+
+def monthly_matrices(cube: pd.DataFrame, distribution=True) -> dict:
+    """{Ajuste Conta: matriz Nome Filial × Período} a partir de um único roll-up do cubo.
+
+    distribution: True = só distribuição, False = só outras áreas, None = tudo.
+    Meses sem lançamento ficam NaN.
+    """
+    filters = {} if distribution is None else {"Distribuicao": distribution}
+    cells = rollup(cube, ["Ajuste Conta", "Nome Filial", "Período"], min_count=1, **filters)
+    periods = sorted(cube["Período"].unique())
+    return {
+        group: sub.droplevel("Ajuste Conta").unstack("Período").reindex(columns=periods)
+        for group, sub in cells.groupby(level="Ajuste Conta", observed=True)
+    }
+
+
+def freight_breakdown(df: pd.DataFrame, distribution=True) -> pd.DataFrame:
+    """Linhas de frete (contas do grupo 84) por Descricao: 'Total <ano>' e 'Total Geral'.
+
+    Uma única agregação sobre as linhas da base, ordenada do maior para o menor
+    Total Geral. distribution: True = só distribuição, False = outras áreas, None = tudo.
+    """
+    mask = account_group(df["Conta Contábil"]).eq(FRETE_GROUP).fillna(False).to_numpy(dtype=bool)
+    if distribution is not None and "Apenas_Distribuicao" in df:
+        mask &= distribution_flag(df["Apenas_Distribuicao"]).to_numpy() == distribution
+    rows = df[mask]
+
+    years = {}
+    for col, label in _periods(rows).items():
+        years.setdefault(f"Total {label[:4]}", []).append(col)
+    lines = pd.DataFrame({name: rows[cols].sum(axis=1) for name, cols in years.items()})
+    lines["Descricao"] = rows["Descricao"].astype("string").str.strip()
+    out = lines.groupby("Descricao", sort=False).sum()
+    out["Total Geral"] = out.sum(axis=1)
+    return out.sort_values("Total Geral", ascending=False, kind="stable")
+
@@ -0,0 +1,89 @@
+# core/export.py
+"""Exportação de todas as análises para um único .xlsx, uma aba por tabela.
+
+Usa o modo write-only do openpyxl: as linhas são gravadas em sequência direto
+no arquivo (em blocos de CHUNK_ROWS), sem montar a árvore de células da
+pasta de trabalho em memória. As tabelas são as de core.analytics.run_all;
+índices com informação (has_index) viram as primeiras colunas, como nos CSVs
+de core.report. Células vazias (NaN/NA) ficam em branco.
+"""
+import io
+import re
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+CHUNK_ROWS = 10_000
+SHEET_TITLE_MAX = 31
+INVALID_TITLE = re.compile(r"[\[\]:*?/\\]")
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def sheet_title(name: str, used: set) -> str:
+    """Nome de aba válido no Excel (sem []:*?/\\, até 31 caracteres) e único na pasta."""
+    base = INVALID_TITLE.sub("_", str(name))[:SHEET_TITLE_MAX] or "Tabela"
+    title, n = base, 1
+    while title.lower() in used:
+        n += 1
+        suffix = f" ({n})"
+        title = base[:SHEET_TITLE_MAX - len(suffix)] + suffix
+    used.add(title.lower())
+    return title
+
+
+def has_index(table) -> bool:
+    """True quando o índice é dado da tabela: tem nome (ex.: Ranking 1..n) ou não é um RangeIndex.
+
+    Só o RangeIndex sem nome (0..n-1 do reset_index) fica fora dos arquivos.
+    """
+    return any(n is not None for n in table.index.names) or not isinstance(table.index, pd.RangeIndex)
+
+
+def _frame(table) -> pd.DataFrame:
+    if isinstance(table, pd.Series):
+        table = table.to_frame()
+    if has_index(table):
+        unnamed = table.index.nlevels == 1 and table.index.name is None
+        table = table.reset_index()
+        if unnamed:
+            table = table.rename(columns={"index": ""})
+    return table
+
+
+def _rows(table: pd.DataFrame):
+    """Linhas como tuplas de valores Python, com NaN/NA -> None, convertidas bloco a bloco."""
+    for start in range(0, len(table), CHUNK_ROWS):
+        chunk = table.iloc[start:start + CHUNK_ROWS].astype(object)
+        yield from chunk.where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+def write_xlsx(tables: dict, target) -> None:
+    """Grava {nome: DataFrame/Series} em `target` (caminho ou arquivo binário), uma aba por tabela."""
+    wb = Workbook(write_only=True)
+    used, bold = set(), Font(bold=True)
+    for name, table in tables.items():
+        table = _frame(table)
+        ws = wb.create_sheet(sheet_title(name, used))
+        ws.freeze_panes = "A2"
+        header = [str(c) if not isinstance(c, tuple) else " / ".join(map(str, c)) for c in table.columns]
+        for i, label in enumerate(header):
+            ws.column_dimensions[get_column_letter(i + 1)].width = max(12, min(len(label) + 2, 50))
+        cells = []
+        for label in header:
+            cell = WriteOnlyCell(ws, value=label)
+            cell.font = bold
+            cells.append(cell)
+        ws.append(cells)
+        for row in _rows(table):
+            ws.append(row)
+    wb.save(target)
+
+
+def xlsx_bytes(tables: dict) -> bytes:
+    """Conteúdo do .xlsx de write_xlsx (para download)."""
+    buf = io.BytesIO()
+    write_xlsx(tables, buf)
+    return buf.getvalue()
@@ -0,0 +1,48 @@
+# core/formatting.py
+"""Textos R$ e % para exibição, formatando a coluna inteira de uma vez.
+
+Cada valor distinto da coluna é formatado uma única vez (e memorizado entre
+chamadas); o resultado é montado por índice a partir dos distintos, sem os
+três str.replace por célula. Mesmo tratamento em todas as páginas: negativo
+como 'R$ -1.234,56' e vazio (NaN/None) pelo texto `na` de cada tabela.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+PT_BR = str.maketrans(",.", ".,")
+
+
+@lru_cache(maxsize=1 << 16)
+def _money(value: float, decimals: int) -> str:
+    """1234567.891 -> '1.234.567,89'."""
+    return f"{value:,.{decimals}f}".translate(PT_BR)
+
+
+@lru_cache(maxsize=1 << 16)
+def _percent(value: float, decimals: int, decimal: str) -> str:
+    text = f"{value:.{decimals}f}%"
+    return text if decimal == "." else text.replace(".", decimal)
+
+
+def _format(values, fmt, na: str):
+    """Aplica fmt a um escalar, ou aos valores distintos de uma coluna/array."""
+    if np.ndim(values) == 0:
+        return na if pd.isna(values) else fmt(float(values))
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    codes, uniques = pd.factorize(s)
+    # código -1 (NaN) cai no último item, o texto `na`
+    texts = np.array([fmt(float(v)) for v in uniques] + [na], dtype=object)
+    out = texts[codes]
+    return pd.Series(out, index=s.index, name=s.name) if isinstance(values, pd.Series) else out
+
+
+def brl(values, na: str = "", decimals: int = 2, prefix: str = "R$ "):
+    """Valor(es) em reais: 1234.5 -> 'R$ 1.234,50'. Aceita escalar, Series ou array."""
+    return _format(values, lambda v: prefix + _money(v, decimals), na)
+
+
+def pct(values, decimals: int = 2, na: str = "", decimal: str = ",", scale: float = 1.0):
+    """Percentual: 12.345 -> '12,35%' (scale=100 para frações; decimal='.' mantém o ponto)."""
+    return _format(values, lambda v: _percent(v * scale, decimals, decimal), na)
@@ -0,0 +1,130 @@
+# core/ingest.py
+"""Leitura em streaming da aba "Banco" com projeção de colunas.
+
+pd.read_excel materializa todas as colunas da aba antes de qualquer filtro.
+Aqui a planilha é percorrida com openpyxl em modo read-only (linha a linha,
+sem montar a árvore de células), o cabeçalho é detectado nas primeiras
+linhas e só as colunas usadas pelo dashboard são guardadas e tipadas. Quais
+colunas são essas vem do registro de esquemas (core.schema).
+
+A leitura também devolve uma marca d'água (hash do cabeçalho, linhas de dados
+já lidas e um hash acumulado delas). Com ela, uma releitura após linhas serem
+acrescentadas no fim da aba tipa só as linhas novas; se o cabeçalho ou alguma
+linha já lida mudou, StaleWatermark indica que é preciso ler tudo.
+
+Numa leitura completa, on_chunk recebe as linhas já tipadas a cada
+CHUNK_ROWS linhas com dados, para quem quer mostrar resultados parciais
+enquanto o arquivo ainda está sendo lido (ui.loading).
+"""
+import hashlib
+from itertools import chain, islice
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from core.loader import HEADER_SCAN_ROWS, SHEET_NAME, header_labels, header_row, type_banco
+from core.profiling import profiled
+from core.schema import schema_for
+
+CHUNK_ROWS = 5_000
+
+
+def _row_key(values) -> bytes:
+    """Representação estável de uma linha da planilha (células vazias no fim não contam)."""
+    values = list(values)
+    while values and values[-1] is None:
+        values.pop()
+    return repr(values).encode("utf-8")
+
+
+class StaleWatermark(ValueError):
+    """A aba não é a leitura anterior com linhas acrescentadas no fim."""
+
+
+def _typed(names, records) -> pd.DataFrame:
+    columns = zip(*records) if records else [()] * len(names)
+    return type_banco(pd.DataFrame({name: np.array(col, dtype=object) for name, col in zip(names, columns)}))
+
+
+def read_banco_stream(path, sheet: str = SHEET_NAME, usecols=None, months: bool = True) -> pd.DataFrame:
+    """Lê a aba em modo read-only guardando só as colunas pedidas.
+
+    usecols: nomes canônicos a manter (None = todos os reconhecidos);
+    months: se True, mantém também as colunas mensais ('AAAA-MM').
+    """
+    return read_banco_tracked(path, sheet, usecols, months)[0]
+
+
+@profiled("leitura (openpyxl)")
+def read_banco_tracked(path, sheet: str = SHEET_NAME, usecols=None, months: bool = True,
+                       since: dict = None, on_chunk=None) -> tuple:
+    """Como read_banco_stream, devolvendo (DataFrame, marca d'água).
+
+    since: marca de uma leitura anterior; só as linhas depois dela são tipadas
+    e devolvidas. Levanta StaleWatermark se a aba não for uma extensão dela.
+    on_chunk(linhas, lidas, total): chamada a cada CHUNK_ROWS linhas com dados
+    (e no fim) com o bloco tipado, as linhas de dados percorridas e o total
+    estimado pela dimensão da aba (None se ausente); só em leituras completas.
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet]
+        rows = ws.iter_rows(values_only=True)
+        head = list(islice(rows, HEADER_SCAN_ROWS))
+        header_idx = header_row(head)
+        if header_idx is None:
+            raise ValueError(f"Não foi possível detectar um cabeçalho na aba '{sheet}'.")
+
+        labels = header_labels(head[header_idx])
+        header_key = hashlib.sha1(_row_key([header_idx] + labels)).hexdigest()
+        if since is not None and since.get("header") != header_key:
+            raise StaleWatermark(f"O cabeçalho da aba '{sheet}' mudou desde a última leitura.")
+        # mapeamento do registro (core.schema): a inferência só roda para cabeçalhos novos
+        picked, names = map(list, zip(*schema_for(sheet, header_idx, labels).select(usecols, months)))
+
+        width = max(picked) + 1
+        pick = itemgetter(*picked) if len(picked) > 1 else (lambda r: (r[picked[0]],))
+        skip = since["rows"] if since is not None else 0
+        if since is not None:
+            on_chunk = None
+        total = ws.max_row - header_idx - 1 if ws.max_row else None
+        digest = hashlib.sha1()
+        records, pending, n, last = [], [], -1, -1
+        for n, row in enumerate(chain(head[header_idx + 1:], rows)):
+            key = _row_key(row)
+            if n < skip:
+                # linhas já lidas: entram só no hash, conferido ao fim delas
+                digest.update(key)
+                if n == skip - 1 and digest.hexdigest() != since["digest"]:
+                    raise StaleWatermark(f"Linhas já lidas da aba '{sheet}' foram alteradas.")
+                continue
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+            values = pick(row)
+            if not any(v is not None for v in values):
+                pending.append(key)
+                continue
+            # a marca só avança em linhas com dados (vazias no fim podem ser preenchidas depois)
+            for k in pending:
+                digest.update(k)
+            pending.clear()
+            digest.update(key)
+            records.append(values)
+            last = n
+            if on_chunk is not None and len(records) % CHUNK_ROWS == 0:
+                on_chunk(_typed(names, records[-CHUNK_ROWS:]), n + 1, total)
+        if on_chunk is not None and len(records) % CHUNK_ROWS:
+            on_chunk(_typed(names, records[-(len(records) % CHUNK_ROWS):]), n + 1, total)
+        if n + 1 < skip:
+            raise StaleWatermark(f"A aba '{sheet}' tem menos linhas que na última leitura.")
+    finally:
+        wb.close()
+
+    if records or since is None:
+        mark = {"header": header_key, "rows": last + 1, "digest": digest.hexdigest()}
+    else:
+        mark = dict(since)
+
+    return _typed(names, records), mark
@@ -0,0 +1,392 @@
+# core/loader.py
+"""Leitura compartilhada da aba "Banco".
+
+Todas as páginas do dashboard usam a mesma planilha. Este módulo faz o parse
+uma única vez por versão do arquivo (caminho + mtime + tamanho) e entrega a
+todas as páginas o mesmo DataFrame normalizado e tipado. Entre reinícios do
+processo o resultado é reaproveitado pelo snapshot em disco (core.snapshot).
+
+O DataFrame devolvido é compartilhado entre páginas e sessões: quem precisar
+criar colunas auxiliares deve trabalhar sobre uma cópia.
+
+Quando a planilha muda só por linhas acrescentadas no fim, a nova versão é a
+anterior + as linhas novas (tipadas sozinhas); banco_refresh() informa isso
+para que os agregados sejam atualizados com o delta em vez de recalculados.
+
+`path` também pode ser um diretório ou padrão glob com várias planilhas (uma
+por ano/unidade); nesse caso a leitura fica a cargo de core.workbooks.
+"""
+import glob
+import os
+import re
+import threading
+import unicodedata
+from contextlib import contextmanager
+from datetime import date, datetime
+from functools import lru_cache, wraps
+from itertools import islice
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from core.compact import compact_frame
+from core.consolidate import extract_codes, unit_column
+from core.money import parse_brl
+from core.profiling import profiled, stage
+
+# ---------- Config ----------
+BASE_DIR = Path(__file__).resolve().parent.parent
+# BANCO_PATH pode apontar para outra planilha ou para um diretório com várias
+FILE_PATH = Path(os.environ.get("BANCO_PATH") or BASE_DIR / "pages" / "Base de Dados - Teste de Gestão de Custos (2).xlsx")
+SHEET_NAME = "Banco"
+
+# nome canônico -> chaves normalizadas aceitas (na ordem de preferência)
+# (os nomes mais específicos vêm antes: "ajuste_conta" contém "conta",
+# "nome_filial" contém "filial")
+COLUMN_KEYS = {
+    "Ajuste Conta": ["ajuste_conta", "ajuste"],
+    "Nome Filial": ["nome_filial", "filial_nome", "nome"],
+    "Conta Contábil": ["conta_contabil", "conta"],
+    "Filial": ["filial", "codigo_filial", "cod_filial"],
+    "Descricao": ["descricao"],
+    "Valores": ["valores", "valor"],
+    "Apenas Frete": ["apenas_frete", "so_frete"],
+    "Apenas_Distribuicao": ["apenas_distribuicao", "apenas_distrib"],
+    "Total 2017": ["total_2017", "total2017"],
+    "Total 2018": ["total_2018", "total2018"],
+}
+REQUIRED_COLUMNS = ["Nome Filial", "Valores"]
+TEXT_COLUMNS = ["Descricao", "Ajuste Conta", "Nome Filial", "Apenas_Distribuicao"]
+CODE_COLUMNS = ["Conta Contábil", "Filial"]
+MONEY_COLUMNS = ["Valores", "Apenas Frete", "Total 2017", "Total 2018"]
+# guardadas como categóricas (core.compact): dicionário de distintos + códigos por linha
+COMPACT_CATEGORIES = TEXT_COLUMNS + ["Unidade"]
+
+HEADER_SCAN_ROWS = 20
+MONTH_LABEL = re.compile(r"^\d{4}-\d{2}$")
+
+
+# ---------- helpers ----------
+def norm(s) -> str:
+    """Normaliza nome de coluna: minúsculas, sem acentos, separado por '_'."""
+    if s is None:
+        return ""
+    s = "".join(c for c in unicodedata.normalize("NFD", str(s)) if unicodedata.category(c) != "Mn")
+    return re.sub(r"[^a-z0-9]+", "_", s.lower()).strip("_")
+
+
+def find_col(columns, keys):
+    """Localiza a coluna pelo nome normalizado: primeiro igualdade exata, depois substring."""
+    norm_map = {norm(c): c for c in columns}
+    for k in keys:
+        if k in norm_map:
+            return norm_map[k]
+    for k in keys:
+        for n, orig in norm_map.items():
+            if k in n:
+                return orig
+    return None
+
+
+def month_label(v):
+    """Converte cabeçalho de mês (datetime) em rótulo 'AAAA-MM'; devolve None se não for mês."""
+    if isinstance(v, (datetime, date, pd.Timestamp)):
+        return f"{v.year:04d}-{v.month:02d}"
+    if isinstance(v, str) and MONTH_LABEL.match(v.strip()):
+        return v.strip()
+    return None
+
+
+def month_columns(df: pd.DataFrame) -> list:
+    """Colunas mensais ('AAAA-MM') do DataFrame normalizado, em ordem cronológica."""
+    return sorted(c for c in df.columns if isinstance(c, str) and MONTH_LABEL.match(c))
+
+
+def file_signature(path) -> tuple:
+    """Identifica a versão do arquivo: (caminho absoluto, mtime em ns, tamanho)."""
+    p = Path(path).resolve()
+    st_ = p.stat()
+    return str(p), st_.st_mtime_ns, st_.st_size
+
+
+# ---------- leitura ----------
+@profiled("leitura (read_excel)")
+def read_sheet(path, sheet: str = SHEET_NAME) -> pd.DataFrame:
+    """Lê a aba uma única vez e promove a primeira linha não vazia a cabeçalho."""
+    raw = pd.read_excel(path, sheet_name=sheet, header=None, engine="openpyxl")
+    return promote_header(raw, sheet)
+
+
+def header_row(head):
+    """Índice da linha de cabeçalho entre as primeiras linhas da aba (None se todas vazias).
+
+    head: DataFrame ou lista de linhas. Conta as células preenchidas de cada
+    linha de uma vez (texto só com espaços não conta) e escolhe a primeira que
+    chega à metade da linha mais cheia, o que pula linhas vazias e títulos
+    soltos acima do cabeçalho.
+    """
+    frame = head if isinstance(head, pd.DataFrame) else pd.DataFrame(list(head))
+    if frame.empty:
+        return None
+    counts = frame.replace(r"^\s*$", np.nan, regex=True).notna().sum(axis=1).to_numpy()
+    if counts.max() == 0:
+        return None
+    return int(np.argmax(counts >= (counts.max() + 1) // 2))
+
+
+def header_labels(row) -> list:
+    """Rótulos do cabeçalho: meses como 'AAAA-MM', demais como texto sem espaços nas pontas ('' se vazio)."""
+    return [month_label(h) or ("" if h is None or pd.isna(h) else str(h).strip()) for h in row]
+
+
+def peek_header(path, sheet: str = SHEET_NAME, rows: int = HEADER_SCAN_ROWS) -> tuple:
+    """(linha do cabeçalho, rótulos) lendo só as primeiras `rows` linhas em modo read-only."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        head = list(islice(wb[sheet].iter_rows(values_only=True), rows))
+    finally:
+        wb.close()
+    idx = header_row(head)
+    if idx is None:
+        raise ValueError(f"Não foi possível detectar um cabeçalho na aba '{sheet}'.")
+    return idx, header_labels(head[idx])
+
+
+def promote_header(raw: pd.DataFrame, sheet: str = SHEET_NAME) -> pd.DataFrame:
+    """Aba lida sem cabeçalho -> DataFrame com a linha detectada por header_row como cabeçalho."""
+    header_idx = header_row(raw.head(HEADER_SCAN_ROWS))
+    if header_idx is None:
+        raise ValueError(f"Não foi possível detectar um cabeçalho na aba '{sheet}'.")
+    df = raw.iloc[header_idx + 1:].reset_index(drop=True)
+    df.columns = header_labels(raw.iloc[header_idx])
+    # descarta colunas sem cabeçalho e sem dados
+    keep = [bool(c) or df.iloc[:, i].notna().any() for i, c in enumerate(df.columns)]
+    return df.loc[:, keep]
+
+
+@profiled("leitura (read_excel, colunas do esquema)")
+def read_banco_excel(path, sheet: str = SHEET_NAME) -> pd.DataFrame:
+    """Base normalizada via pd.read_excel lendo só as colunas do esquema registrado (core.schema).
+
+    O cabeçalho vem de peek_header (primeiras linhas, openpyxl read-only); a
+    leitura de verdade começa logo abaixo dele, uma única vez.
+    """
+    from core.schema import schema_for
+
+    header_idx, labels = peek_header(path, sheet)
+    schema = schema_for(sheet, header_idx, labels)
+    picked = schema.select()
+    df = pd.read_excel(path, sheet_name=sheet, header=None, skiprows=header_idx + 1, engine="openpyxl",
+                       usecols=[pos for pos, _ in picked], dtype=schema.dtype(picked))
+    df.columns = [canon for _, canon in picked]
+    return type_banco(df)
+
+
+def resolve_columns(labels) -> dict:
+    """Mapeia rótulo do cabeçalho -> nome canônico (inclui as colunas mensais 'AAAA-MM')."""
+    labels = [c for c in labels if isinstance(c, str) and c]
+    rename = {}
+    for canon, keys in COLUMN_KEYS.items():
+        col = find_col([c for c in labels if c not in rename], keys)
+        if col is not None:
+            rename[col] = canon
+    missing = [c for c in REQUIRED_COLUMNS if c not in rename.values()]
+    if missing:
+        raise ValueError(
+            "Não foi possível identificar colunas obrigatórias (" + " / ".join(missing) + "). "
+            "Colunas detectadas: " + ", ".join(labels)
+        )
+    for c in labels:
+        if MONTH_LABEL.match(c) and c not in rename:
+            rename[c] = c
+    return rename
+
+
+def type_banco(out: pd.DataFrame) -> pd.DataFrame:
+    """Tipa as colunas canônicas (códigos, textos, valores), remove linhas vazias e compacta (core.compact)."""
+    out = out[[c for c in COLUMN_KEYS if c in out] + month_columns(out)]
+    with stage("códigos e textos"):
+        for c in CODE_COLUMNS:
+            if c in out:
+                out[c] = extract_codes(out[c])
+        for c in TEXT_COLUMNS:
+            if c in out:
+                out[c] = out[c].where(out[c].isna(), out[c].astype(str).str.strip())
+    with stage("valores R$"):
+        for c in MONEY_COLUMNS + month_columns(out):
+            if c in out:
+                out[c] = parse_brl(out[c])
+    # linhas totalmente vazias (rodapés, espaços) não fazem parte da base
+    out = out.dropna(how="all").reset_index(drop=True)
+    # unidade consolidada (28 + 80 = São Paulo), compartilhada por todas as páginas
+    with stage("consolidação (unidade)"):
+        out["Unidade"] = unit_column(out["Nome Filial"], out.get("Filial"))
+    return compact_frame(out, COMPACT_CATEGORIES, CODE_COLUMNS)
+
+
+def normalize_banco(df: pd.DataFrame) -> pd.DataFrame:
+    """Renomeia para os nomes canônicos e tipa as colunas (códigos, textos, valores)."""
+    rename = resolve_columns(df.columns)
+    return type_banco(df[list(rename)].rename(columns=rename))
+
+
+class Refresh(NamedTuple):
+    """Como a versão atual da base foi obtida."""
+    mark: dict            # marca d'água da versão atual (None = leitura sem rastreio)
+    base: dict            # marca da versão anterior, quando atual = anterior + `rows`
+    rows: pd.DataFrame    # linhas acrescentadas (None quando a base foi lida por inteiro)
+
+
+# (caminho, aba) -> (assinatura do arquivo, Refresh) da última versão carregada
+_REFRESH = {}
+# on_chunk da thread atual para leituras completas com resultados parciais
+_CHUNKS = threading.local()
+# (versão, aba, engine) -> trava da leitura: chamadas simultâneas da mesma versão
+# (thread de carga, pré-aquecimento, outras páginas) esperam a primeira terminar
+# em vez de repetir o parse, que o lru_cache não deduplica enquanto está em curso
+_LOADING = {}
+_LOADING_LOCK = threading.Lock()
+
+
+def _version_lock(key: tuple) -> threading.Lock:
+    with _LOADING_LOCK:
+        lock = _LOADING.get(key)
+        if lock is None:
+            # versões anteriores do mesmo arquivo/conjunto não serão mais lidas
+            for old in [k for k in _LOADING if k[0][0] == key[0][0] and k[1:] == key[1:]]:
+                del _LOADING[old]
+            lock = _LOADING[key] = threading.Lock()
+        return lock
+
+
+@contextmanager
+def reporting_chunks(on_chunk):
+    """Dentro do bloco, a leitura completa de uma planilha (engine="stream") feita
+    por esta thread repassa os blocos tipados a on_chunk (core.ingest).
+
+    Snapshots em disco, releituras só das linhas novas e várias planilhas não
+    passam por blocos: o resultado chega inteiro, no fim.
+    """
+    previous = getattr(_CHUNKS, "on_chunk", None)
+    _CHUNKS.on_chunk = on_chunk
+    try:
+        yield
+    finally:
+        _CHUNKS.on_chunk = previous
+
+
+def append_banco(df: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """Base normalizada + linhas novas já tipadas (mesmas colunas)."""
+    out = pd.concat([df, rows], ignore_index=True)
+    # categorias com dicionários diferentes voltam do concat como texto
+    return compact_frame(out, COMPACT_CATEGORIES, CODE_COLUMNS)
+
+
+@lru_cache(maxsize=4)
+def _load_version(path: str, mtime_ns: int, size: int, sheet: str, engine: str) -> pd.DataFrame:
+    from core.snapshot import load_or_parse
+
+    if engine != "stream":
+        df, mark = load_or_parse(path, sheet, lambda: (read_banco_excel(path, sheet), None))
+        _REFRESH[(path, sheet)] = ((path, mtime_ns, size), Refresh(mark, None, None))
+        return df
+
+    from core.ingest import read_banco_tracked
+
+    step = {}
+
+    def extend(prev: pd.DataFrame, since: dict):
+        rows, mark = read_banco_tracked(path, sheet, since=since)
+        step.update(base=since, rows=rows)
+        return append_banco(prev, rows), mark
+
+    on_chunk = getattr(_CHUNKS, "on_chunk", None)
+    df, mark = load_or_parse(path, sheet, lambda: read_banco_tracked(path, sheet, on_chunk=on_chunk), extend)
+    _REFRESH[(path, sheet)] = ((path, mtime_ns, size), Refresh(mark, step.get("base"), step.get("rows")))
+    return df
+
+
+def is_collection(path) -> bool:
+    """True quando `path` é um diretório ou padrão glob (várias planilhas)."""
+    return path is not None and (Path(path).is_dir() or glob.has_magic(str(path)))
+
+
+def base_exists(path=None) -> bool:
+    """True quando a base existe: o arquivo ou, para diretório/glob, ao menos uma planilha."""
+    path = path or FILE_PATH
+    if is_collection(path):
+        from core.workbooks import expand_sources
+
+        try:
+            expand_sources(path)
+        except FileNotFoundError:
+            return False
+        return True
+    return Path(path).exists()
+
+
+def load_banco(path=None, sheet: str = SHEET_NAME, engine: str = "stream") -> pd.DataFrame:
+    """Aba "Banco" normalizada, lida uma vez por versão do arquivo (não alterar in-place).
+
+    engine="stream" lê com openpyxl em modo read-only só as colunas usadas pelo
+    dashboard; engine="pandas" usa pd.read_excel com as mesmas colunas. Em ambos
+    o mapeamento de colunas vem do registro de esquemas (core.schema). Com um
+    diretório ou glob em `path`, junta todas as planilhas (core.workbooks).
+    Chamadas simultâneas para a mesma versão fazem uma única leitura.
+    """
+    path = path or FILE_PATH
+    version = dataset_version(path)
+    with _version_lock((version, sheet, engine)):
+        if is_collection(path):
+            from core.workbooks import load_workbooks
+
+            return load_workbooks(path, sheet, engine)
+        return _load_version(*version, sheet, engine)
+
+
+def banco_refresh(path=None, sheet: str = SHEET_NAME) -> Refresh:
+    """Como a versão atual da base foi obtida (leitura completa ou anterior + linhas novas)."""
+    path = path or FILE_PATH
+    load_banco(path, sheet)
+    if is_collection(path):
+        return Refresh(None, None, None)
+    sig = file_signature(path)
+    entry = _REFRESH.get((sig[0], sheet))
+    return entry[1] if entry is not None and entry[0] == sig else Refresh(None, None, None)
+
+
+def dataset_version(path=None) -> tuple:
+    """Chave da versão atual da base, para cachear cálculos derivados."""
+    path = path or FILE_PATH
+    if is_collection(path):
+        from core.workbooks import collection_version
+
+        return collection_version(path)
+    return file_signature(path)
+
+
+def versioned(build=None, *, maxsize: int = 8):
+    """Decorador: build(path, sheet, *args) calculado uma vez por versão da base e argumentos.
+
+    A função decorada é chamada como f(*args, path=None, sheet=SHEET_NAME);
+    os argumentos extras precisam ser hasheáveis. Guarda os `maxsize` resultados
+    usados mais recentemente (@versioned ou @versioned(maxsize=32)).
+    """
+    if build is None:
+        return lambda fn: versioned(fn, maxsize=maxsize)
+
+    @lru_cache(maxsize=maxsize)
+    def cached(version: tuple, sheet: str, args: tuple):
+        return build(version[0], sheet, *args)
+
+    @wraps(build)
+    def wrapper(*args, path=None, sheet: str = SHEET_NAME):
+        return cached(dataset_version(path), sheet, args)
+
+    wrapper.cache_clear = cached.cache_clear
+    wrapper.cache_info = cached.cache_info
+    return wrapper
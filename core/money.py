@@ -0,0 +1,104 @@
+# core/money.py
+"""Conversão vetorizada de valores monetários em formato brasileiro.
+
+Substitui os conversores célula a célula que cada página tinha (to_num,
+to_numeric_col, to_numeric, br_to_float, parse_brl). A coluna inteira é
+tratada com kernels de string do Arrow (ou o accessor .str do pandas, sem
+pyarrow) e cada texto distinto é convertido uma única vez.
+
+Regras:
+- "R$", espaços e demais símbolos são ignorados;
+- "", "-" e "—" viram NaN;
+- negativo: "-" no início ou no fim, ou o valor entre parênteses, depois de
+  tirar "R$" e espaços ("R$ -1.234,56", "-R$ 1.234,56", "1.234,56-",
+  "(1.234,56)"); um "-" no meio ("1.234,56 - estorno") não muda o sinal;
+- com "." e "," presentes, o separador mais à direita é o decimal;
+- só "," (uma vez): vírgula decimal ("1,234" -> 1.234);
+- só "." (uma vez): decimal, exceto no padrão de milhar "1.234" -> 1234;
+- separadores repetidos ("1.234.567", "1,234,567") são de milhar.
+Células já numéricas são mantidas como estão.
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - pyarrow vem com o streamlit
+    pa = None
+
+COMMA_DECIMAL = r"^[\d.]*,\d*$"
+DOT_DECIMAL = r"^[\d,]*\.\d*$"
+THOUSANDS_ONLY = r"^\d{1,3}\.\d{3}$"
+CURRENCY_AND_SPACES = r"[Rr]\$|\s+"
+NEGATIVE = r"^-|-$|^\(.*\)$"
+
+
+def _parse_text_arrow(text: pd.Series) -> np.ndarray:
+    """Caminho Arrow: dicionário dos textos distintos + kernels de string em C++."""
+    encoded = pc.dictionary_encode(pa.array(text, type=pa.string(), from_pandas=True))
+    t = pc.utf8_trim_whitespace(encoded.dictionary)
+    negative = pc.match_substring_regex(pc.replace_substring_regex(t, CURRENCY_AND_SPACES, ""), NEGATIVE)
+    digits = pc.replace_substring_regex(t, r"[^0-9,.]+", "")
+    comma_dec = pc.match_substring_regex(digits, COMMA_DECIMAL)
+    dot_dec = pc.and_(
+        pc.match_substring_regex(digits, DOT_DECIMAL),
+        pc.invert(pc.match_substring_regex(digits, THOUSANDS_ONLY)),
+    )
+    number = pc.if_else(
+        comma_dec,
+        pc.replace_substring(pc.replace_substring(digits, ".", ""), ",", "."),
+        pc.if_else(
+            dot_dec,
+            pc.replace_substring(digits, ",", ""),
+            pc.replace_substring(pc.replace_substring(digits, ".", ""), ",", ""),
+        ),
+    )
+    # depois da limpeza só sobram dígitos e no máximo um "."; sem dígito -> nulo
+    number = pc.if_else(pc.match_substring_regex(number, r"\d"), number, pa.scalar(None, pa.string()))
+    values = pc.cast(number, pa.float64())
+    values = pc.if_else(negative, pc.negate(pc.abs(values)), values)
+    return pc.take(values, encoded.indices).to_numpy(zero_copy_only=False)
+
+
+def _parse_text_pandas(text: pd.Series) -> np.ndarray:
+    """Caminho sem pyarrow: mesmas regras com o accessor .str, sobre os textos distintos."""
+    codes, uniques = pd.factorize(text)
+    t = pd.Series(uniques, dtype=object).str.strip()
+    negative = t.str.replace(CURRENCY_AND_SPACES, "", regex=True).str.contains(NEGATIVE, regex=True)
+    digits = t.str.replace(r"[^\d,.]", "", regex=True)
+
+    comma_dec = digits.str.contains(COMMA_DECIMAL, regex=True)
+    dot_dec = digits.str.contains(DOT_DECIMAL, regex=True) & ~digits.str.contains(THOUSANDS_ONLY, regex=True)
+    number = digits.str.replace(r"[.,]", "", regex=True)
+    number[comma_dec] = digits[comma_dec].str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    number[dot_dec] = digits[dot_dec].str.replace(",", "", regex=False)
+
+    values = pd.to_numeric(number.mask(number == ""), errors="coerce").to_numpy(dtype="float64")
+    values = np.where(negative.to_numpy(dtype=bool), -np.abs(values), values)
+    out = np.full(len(codes), np.nan)
+    found = codes >= 0
+    out[found] = values[codes[found]]
+    return out
+
+
+def parse_brl(values) -> pd.Series:
+    """Converte uma coluna (textos BRL e/ou números) para float64; inválidos viram NaN."""
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+        return s.astype("float64")
+
+    kind = pd.api.types.infer_dtype(s, skipna=True)
+    if kind in ("floating", "integer", "mixed-integer-float", "decimal", "empty"):
+        return pd.to_numeric(s, errors="coerce").astype("float64")
+
+    parse_text = _parse_text_pandas if pa is None else _parse_text_arrow
+    if kind == "string":
+        out = parse_text(s)
+    else:
+        # colunas mistas (números + textos): só os textos passam pelo parser
+        is_text = s.map(type).eq(str).to_numpy()
+        out = pd.to_numeric(s.where(~is_text), errors="coerce").to_numpy(dtype="float64", na_value=np.nan, copy=True)
+        if is_text.any():
+            out[is_text] = parse_text(s[is_text])
+    return pd.Series(out, index=s.index, name=s.name)
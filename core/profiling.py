@@ -0,0 +1,132 @@
+# core/profiling.py
+"""Tempo por etapa nomeada, por execução de página (opcional).
+
+Ligado pela variável de ambiente DASH_PROFILE=1 ou pelo parâmetro ?perfil=1 na
+URL (ui.profiling). Há dois tipos de etapa:
+
+    lap(nome)        etapa da página: o trecho desde o lap anterior (ou o início);
+                     não exige indentar o script da página
+    stage(nome)      trecho interno do core (leitura, valores R$, cubo...), como
+                     bloco `with` ou decorador @profiled(nome); podem se aninhar
+
+Sem profiler ativo as duas funções só consultam uma ContextVar. Cada execução
+vira uma linha JSON em .cache/profile.jsonl (ou DASH_PROFILE_LOG).
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+
+ENV_VAR = "DASH_PROFILE"
+LOG_PATH = Path(os.environ.get("DASH_PROFILE_LOG") or Path(__file__).resolve().parent.parent / ".cache" / "profile.jsonl")
+TRUE_VALUES = {"1", "true", "sim", "s", "yes", "y", "on"}
+
+_current = ContextVar("profiler", default=None)
+
+
+def enabled_by(value) -> bool:
+    """True para '1', 'true', 'sim'... (valor de variável de ambiente ou parâmetro de URL)."""
+    return str(value or "").strip().lower() in TRUE_VALUES
+
+
+def env_enabled() -> bool:
+    return enabled_by(os.environ.get(ENV_VAR))
+
+
+class Profiler:
+    """Etapas de uma execução: nome, início e duração em segundos, profundidade e origem."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.created = datetime.now()
+        self.stages = []
+        self.total = None
+        self._t0 = self._lap = time.perf_counter()
+        self._stack = []
+
+    def _add(self, name: str, start: float, end: float, kind: str, depth: int = 0) -> None:
+        self.stages.append({"stage": name, "kind": kind, "depth": depth,
+                            "start": start - self._t0, "seconds": end - start})
+
+    @contextmanager
+    def stage(self, name: str):
+        self._stack.append(name)
+        depth = len(self._stack) - 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, start, time.perf_counter(), "core", depth)
+            self._stack.pop()
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        self._add(name, self._lap, now, "página")
+        self._lap = now
+
+    def finish(self) -> "Profiler":
+        if self.total is None:
+            self.total = time.perf_counter() - self._t0
+            self.stages.sort(key=lambda s: (s["start"], -s["seconds"]))
+        return self
+
+    def record(self) -> dict:
+        return {"ts": self.created.isoformat(timespec="seconds"), "page": self.name,
+                "total": round(self.total or 0.0, 6),
+                "stages": [{**s, "start": round(s["start"], 6), "seconds": round(s["seconds"], 6)}
+                           for s in self.stages]}
+
+    def write(self, path=None) -> None:
+        """Acrescenta a execução ao log JSONL (uma linha por execução)."""
+        path = Path(path or LOG_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.record(), ensure_ascii=False) + "\n")
+
+
+def start(name: str) -> Profiler:
+    """Ativa um profiler novo para a execução atual."""
+    profiler = Profiler(name)
+    _current.set(profiler)
+    return profiler
+
+
+def stop():
+    """Desativa e devolve o profiler atual (finalizado), ou None."""
+    profiler = _current.get()
+    _current.set(None)
+    return profiler.finish() if profiler is not None else None
+
+
+def lap(name: str) -> None:
+    profiler = _current.get()
+    if profiler is not None:
+        profiler.lap(name)
+
+
+@contextmanager
+def stage(name: str):
+    profiler = _current.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
+
+
+def profiled(name: str):
+    """Decorador: a função inteira conta como stage(name)."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = _current.get()
+            if profiler is None:
+                return fn(*args, **kwargs)
+            with profiler.stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
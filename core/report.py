@@ -0,0 +1,64 @@
+# core/report.py
+"""Relatório em lote: as seis análises do dashboard gravadas em CSV, sem navegador.
+
+Uso (a partir da raiz do projeto):
+    python -m core.report --saida relatorios
+    python -m core.report --base "planilhas/*.xlsx" --saida relatorios/2018
+    python -m core.report --xlsx   (também grava analises.xlsx, uma aba por tabela)
+
+A base é lida uma vez (com o snapshot/leitura incremental de core.loader), o
+cubo é montado uma vez e todas as análises saem dele (core.analytics.run_all).
+CSVs com ';' e vírgula decimal, para abrir direto no Excel em português.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from core.analytics import run_all
+from core.cube import build_cube
+from core.export import has_index, write_xlsx
+from core.loader import FILE_PATH, SHEET_NAME, load_banco
+
+
+def write_reports(tables: dict, out_dir) -> list:
+    """Grava cada tabela em <out_dir>/<nome>.csv e devolve os caminhos."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, table in tables.items():
+        path = out_dir / f"{name}.csv"
+        # índice 0..n-1 sem nome não vai para o arquivo (has_index); 4 casas tiram o ruído de ponto flutuante
+        table.round(4).to_csv(path, sep=";", decimal=",", encoding="utf-8-sig", index=has_index(table))
+        paths.append(path)
+    return paths
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--base", default=str(FILE_PATH), help="planilha, diretório ou padrão glob (padrão: BANCO_PATH)")
+    ap.add_argument("--aba", default=SHEET_NAME, help="aba com a base (padrão: Banco)")
+    ap.add_argument("--saida", default="relatorios", help="diretório dos CSVs")
+    ap.add_argument("--xlsx", action="store_true", help="grava também <saida>/analises.xlsx com todas as tabelas")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    try:
+        df = load_banco(args.base, args.aba)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Erro ao ler a base: {e}", file=sys.stderr)
+        return 1
+    tables = run_all(df, build_cube(df))
+    for path in write_reports(tables, args.saida):
+        print(path)
+    if args.xlsx:
+        path = Path(args.saida) / "analises.xlsx"
+        write_xlsx(tables, path)
+        print(path)
+    rows = f"{len(df):,}".replace(",", ".")
+    print(f"{len(tables)} tabelas de {rows} linhas da base em {time.perf_counter() - t0:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# core/schema.py
+"""Registro de esquemas da aba "Banco": mapeamento de colunas e tipos, persistido.
+
+Achar as colunas canônicas é uma busca aproximada pelos nomes do cabeçalho
+(core.loader.resolve_columns). Ela roda uma vez por assinatura de cabeçalho
+(hash da aba, da linha do cabeçalho e dos rótulos) e o resultado fica em
+.cache/schema.json: para cada coluna canônica, o rótulo original, a posição
+na aba e o tipo. Leituras seguintes da mesma planilha, ou de outra com o mesmo
+layout, pulam a inferência e pedem ao leitor só as colunas tipadas
+(usecols/dtype). Uma entrada que não confere com o cabeçalho atual é inferida
+e gravada de novo.
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+from core.loader import (BASE_DIR, CODE_COLUMNS, MONEY_COLUMNS, MONTH_LABEL, REQUIRED_COLUMNS, TEXT_COLUMNS,
+                         resolve_columns)
+
+SCHEMA_PATH = Path(os.environ.get("BANCO_SCHEMA") or BASE_DIR / ".cache" / "schema.json")
+# incrementar quando as regras de resolve_columns ou o formato da entrada mudarem
+SCHEMA_VERSION = 1
+# tipo da coluna -> dtype pedido ao pd.read_excel (códigos e valores chegam como
+# texto ou número misturados e são convertidos por extract_codes/parse_brl)
+READ_DTYPES = {"codigo": object, "texto": str, "valor": object, "mes": object}
+
+
+def column_kind(canon: str) -> str:
+    """Tipo da coluna canônica, como type_banco a trata: codigo, texto, valor ou mes."""
+    if canon in CODE_COLUMNS:
+        return "codigo"
+    if canon in TEXT_COLUMNS:
+        return "texto"
+    if canon in MONEY_COLUMNS:
+        return "valor"
+    if MONTH_LABEL.match(canon):
+        return "mes"
+    raise ValueError(f"Coluna sem tipo definido: {canon}")
+
+
+class Schema(NamedTuple):
+    header_row: int      # linha do cabeçalho na aba (0 = primeira)
+    columns: dict        # nome canônico -> {"label": rótulo, "pos": posição na aba, "kind": tipo}
+
+    def select(self, usecols=None, months: bool = True) -> list:
+        """[(posição, nome canônico)] em ordem de posição; usecols e months como em read_banco_stream."""
+        picked = [(c["pos"], canon) for canon, c in self.columns.items()
+                  if (c["kind"] == "mes" and months) or (c["kind"] != "mes" and (usecols is None or canon in usecols))]
+        return sorted(picked)
+
+    def dtype(self, picked) -> dict:
+        """dtype por posição para pd.read_excel: textos como str, o resto cru (tipado por type_banco)."""
+        return {pos: READ_DTYPES[self.columns[canon]["kind"]] for pos, canon in picked}
+
+    def to_json(self) -> dict:
+        return {"header_row": self.header_row, "columns": self.columns}
+
+
+def header_signature(sheet: str, header_row: int, labels) -> str:
+    """Assinatura do layout: aba, linha do cabeçalho e rótulos (vazios no fim não contam)."""
+    labels = list(labels)
+    while labels and not labels[-1]:
+        labels.pop()
+    key = json.dumps([SCHEMA_VERSION, sheet, header_row, labels], ensure_ascii=False)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def infer_schema(header_row: int, labels) -> Schema:
+    """Inferência completa (resolve_columns) sobre os rótulos do cabeçalho."""
+    labels = list(labels)
+    rename = resolve_columns(labels)
+    columns = {}
+    for label, canon in rename.items():
+        columns[canon] = {"label": label, "pos": labels.index(label), "kind": column_kind(canon)}
+    return Schema(header_row, dict(sorted(columns.items(), key=lambda kv: kv[1]["pos"])))
+
+
+def validate_schema(schema: Schema, header_row: int, labels) -> list:
+    """Problemas do mapeamento frente ao cabeçalho atual (lista vazia = válido)."""
+    labels = list(labels)
+    problems = []
+    if schema.header_row != header_row:
+        problems.append(f"cabeçalho na linha {header_row + 1}, esperado na {schema.header_row + 1}")
+    problems += [f"coluna obrigatória ausente: {c}" for c in REQUIRED_COLUMNS if c not in schema.columns]
+    positions = [c["pos"] for c in schema.columns.values()]
+    if len(set(positions)) < len(positions):
+        problems.append("duas colunas canônicas na mesma posição")
+    for canon, c in schema.columns.items():
+        if not 0 <= c["pos"] < len(labels) or labels[c["pos"]] != c["label"]:
+            problems.append(f"'{canon}' não está mais em '{c['label']}' (coluna {c['pos'] + 1})")
+        elif c.get("kind") != column_kind(canon):
+            problems.append(f"tipo de '{canon}' diferente do esperado")
+    return problems
+
+
+class SchemaRegistry:
+    """Esquemas por assinatura de cabeçalho, em um arquivo JSON (carregado sob demanda)."""
+
+    def __init__(self, path=SCHEMA_PATH):
+        self.path = Path(path)
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self) -> None:
+        # outros processos (core.workbooks) podem ter gravado entradas novas: junta antes
+        entries = {**self._read(), **self._entries}
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(entries, ensure_ascii=False, indent=1), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # sem disco gravável o registro vale só para este processo
+
+    def schema_for(self, sheet: str, header_row: int, labels) -> Schema:
+        """Esquema registrado para este cabeçalho; infere, valida e grava se não houver um válido."""
+        labels = list(labels)
+        sig = header_signature(sheet, header_row, labels)
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._read()
+            entry = self._entries.get(sig)
+            if isinstance(entry, dict):
+                try:
+                    schema = Schema(int(entry["header_row"]), dict(entry["columns"]))
+                    if not validate_schema(schema, header_row, labels):
+                        return schema
+                except (KeyError, TypeError, ValueError):
+                    pass
+            schema = infer_schema(header_row, labels)
+            problems = validate_schema(schema, header_row, labels)
+            if problems:
+                raise ValueError("Mapeamento de colunas inválido: " + "; ".join(problems))
+            self._entries[sig] = schema.to_json()
+            self._write()
+            return schema
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+
+REGISTRY = SchemaRegistry()
+
+
+def schema_for(sheet: str, header_row: int, labels) -> Schema:
+    """Esquema do cabeçalho pelo registro padrão (.cache/schema.json ou BANCO_SCHEMA)."""
+    return REGISTRY.schema_for(sheet, header_row, labels)
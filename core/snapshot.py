@@ -0,0 +1,129 @@
+# core/snapshot.py
+"""Snapshot colunar (Arrow IPC) da base já processada.
+
+O parse com openpyxl é a etapa mais lenta de uma partida a frio. Na primeira
+leitura de cada conteúdo de planilha o DataFrame normalizado é gravado em
+disco, com nome derivado do hash do conteúdo do arquivo; reinícios do app ou
+de workers do Streamlit apenas mapeiam esse arquivo em memória.
+
+Junto com o snapshot fica a marca d'água da leitura (metadado do schema). Se
+a planilha mudou só por linhas acrescentadas no fim, o snapshot anterior é
+estendido com as linhas novas em vez de a aba ser lida e tipada de novo.
+
+Se o pyarrow não estiver disponível, os snapshots são simplesmente ignorados.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # pragma: no cover - pyarrow vem com o streamlit
+    pa = None
+
+from core.loader import BASE_DIR
+from core.profiling import profiled
+
+SNAPSHOT_DIR = BASE_DIR / ".cache" / "snapshots"
+# incrementar quando o formato do DataFrame normalizado mudar
+SNAPSHOT_VERSION = 3
+META_KEY = b"banco.watermark"
+CHUNK_SIZE = 1 << 20
+
+
+def content_hash(path) -> str:
+    """SHA-256 do conteúdo do arquivo (lido em blocos)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _prefix(path, sheet: str) -> str:
+    source = hashlib.sha1(f"{Path(path).resolve()}|{sheet}".encode("utf-8")).hexdigest()[:10]
+    return f"banco-v{SNAPSHOT_VERSION}-{source}-"
+
+
+def snapshot_path(path, sheet: str) -> Path:
+    """Arquivo de snapshot para o conteúdo atual da planilha."""
+    return SNAPSHOT_DIR / f"{_prefix(path, sheet)}{content_hash(path)[:24]}.arrow"
+
+
+@profiled("snapshot (leitura)")
+def read_snapshot(target: Path):
+    """Lê o snapshot via memory-map: (DataFrame, marca d'água ou None); None se não existir/corrompido."""
+    if pa is None or not target.exists():
+        return None
+    try:
+        with pa.memory_map(str(target), "r") as source:
+            table = ipc.open_file(source).read_all()
+        raw = (table.schema.metadata or {}).get(META_KEY)
+        return table.to_pandas(), (json.loads(raw) if raw else None)
+    except (OSError, ValueError, pa.ArrowInvalid):
+        return None
+
+
+def previous_snapshot(target: Path):
+    """Snapshot mais recente da mesma planilha/aba com outro conteúdo (ou None)."""
+    prefix = target.name[: target.name.rfind("-") + 1]
+    older = [p for p in target.parent.glob(prefix + "*.arrow") if p != target]
+    if not older:
+        return None
+    return read_snapshot(max(older, key=lambda p: p.stat().st_mtime_ns))
+
+
+@profiled("snapshot (gravação)")
+def write_snapshot(df: pd.DataFrame, target: Path, mark: dict = None) -> None:
+    """Grava o snapshot (sem compressão, para permitir memory-map) e remove os antigos da mesma fonte."""
+    if pa is None:
+        return
+    target.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if mark is not None:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), META_KEY: json.dumps(mark)})
+    tmp = target.with_suffix(f".tmp{os.getpid()}")
+    try:
+        with pa.OSFile(str(tmp), "wb") as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, target)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        return
+    prefix = target.name[: target.name.rfind("-") + 1]
+    for old in target.parent.glob(prefix + "*.arrow"):
+        if old != target:
+            old.unlink(missing_ok=True)
+
+
+def load_or_parse(path, sheet: str, parse, extend=None) -> tuple:
+    """(DataFrame, marca d'água) do conteúdo atual da planilha.
+
+    Ordem: snapshot do conteúdo atual; `extend(df_anterior, marca)` sobre o
+    snapshot anterior (só linhas acrescentadas); `parse()` completo. parse e
+    extend devolvem (DataFrame, marca); extend levanta ValueError quando a
+    planilha não é uma extensão da anterior.
+    """
+    if pa is None:
+        return parse()
+    target = snapshot_path(path, sheet)
+    found = read_snapshot(target)
+    if found is not None:
+        return found
+    result = None
+    if extend is not None:
+        prev = previous_snapshot(target)
+        if prev is not None and prev[1] is not None:
+            try:
+                result = extend(*prev)
+            except ValueError:
+                result = None
+    if result is None:
+        result = parse()
+    write_snapshot(result[0], target, result[1])
+    return result
@@ -0,0 +1,65 @@
+# core/trend.py
+"""Tendências mensais calculadas em lote.
+
+Recebe a matriz de séries (uma linha por filial/grupo/conta, uma coluna por
+mês) e calcula, para todas as linhas de uma vez, a inclinação da reta de
+mínimos quadrados, a variação % entre o primeiro e o último mês com valor e o
+rótulo executivo. Meses NaN ficam fora do ajuste, como no np.polyfit por
+linha que a página 3 usava.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _fit(values: np.ndarray) -> tuple:
+    """(slope, pct, n) por linha de uma matriz 2D com NaN nos meses ausentes."""
+    mask = ~np.isnan(values)
+    n = mask.sum(axis=1)
+    x = np.broadcast_to(np.arange(values.shape[1], dtype=float), values.shape)
+    y = np.where(mask, values, 0.0)
+
+    # reta de mínimos quadrados com x e y centrados (só nos pontos válidos)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = np.where(mask, x, 0.0).sum(axis=1) / n
+        y_mean = y.sum(axis=1) / n
+        dx = np.where(mask, x - x_mean[:, None], 0.0)
+        dy = np.where(mask, y - y_mean[:, None], 0.0)
+        sxx = (dx * dx).sum(axis=1)
+        slope = np.where((n >= 2) & (sxx > 0), (dx * dy).sum(axis=1) / sxx, 0.0)
+
+    rows = np.arange(values.shape[0])
+    first = values[rows, mask.argmax(axis=1)]
+    last = values[rows, values.shape[1] - 1 - mask[:, ::-1].argmax(axis=1)]
+    ok = (n >= 2) & (first != 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct = np.where(ok, (last - first) / np.where(ok, first, 1.0) * 100, np.nan)
+    return slope, pct, n
+
+
+def trend_labels(pct, slope) -> np.ndarray:
+    """Rótulo executivo curto para cada par (pct, slope)."""
+    pct = np.asarray(pct, dtype=float)
+    slope = np.asarray(slope, dtype=float)
+    shown = np.char.add(np.char.add(" (", np.char.mod("%.1f", pct)), "%)")
+    conditions = [
+        np.isnan(pct),
+        (pct > 8) | (slope > 0),
+        pct > 3,
+        (pct >= -3) & (pct <= 3),
+        (pct < -8) | (slope < 0),
+    ]
+    names = ["Indeterminado", "Crescimento forte", "Crescimento moderado", "Estável", "Queda forte"]
+    name = np.select(conditions, names, default="Queda moderada")
+    return np.where(np.isnan(pct), name, np.char.add(name.astype(str), shown))
+
+
+def batch_trends(series: pd.DataFrame) -> pd.DataFrame:
+    """Tendência de cada linha da matriz (colunas = meses em ordem): pct, slope, n_meses e rótulo."""
+    values = series.to_numpy(dtype="float64", na_value=np.nan)
+    if values.shape[1] == 0:
+        values = np.full((len(series), 1), np.nan)
+    slope, pct, n = _fit(values)
+    return pd.DataFrame(
+        {"pct": pct, "slope": slope, "n_meses": n, "label_short": trend_labels(pct, slope)},
+        index=series.index,
+    )
@@ -0,0 +1,107 @@
+# core/workbooks.py
+"""Várias planilhas (uma por ano e/ou unidade de negócio) lidas como uma base só.
+
+Recebe um diretório ou padrão glob. Cada arquivo é lido por load_banco (com o
+snapshot e a leitura incremental de cada um) em um pool de processos iniciados
+com spawn, então o tempo total fica próximo ao do maior arquivo. As colunas fixas precisam ser as
+mesmas em todos os arquivos; as colunas mensais são unidas (mês ausente em um
+arquivo fica NaN). Cada linha leva o arquivo de origem e o período que ele cobre.
+"""
+import glob
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from core.compact import compact_frame
+from core.loader import (CODE_COLUMNS, COMPACT_CATEGORIES, MONTH_LABEL, SHEET_NAME, file_signature, load_banco,
+                         month_columns)
+from core.profiling import profiled
+
+PATTERNS = ("*.xlsx", "*.xlsm")
+SOURCE_COLUMN = "Arquivo"
+PERIOD_COLUMN = "Período Arquivo"
+
+
+def expand_sources(path) -> list:
+    """Planilhas do diretório/padrão em ordem de nome (ignora os temporários '~$' do Excel)."""
+    p = Path(path)
+    found = [f for pat in PATTERNS for f in p.glob(pat)] if p.is_dir() else map(Path, glob.glob(str(p)))
+    files = sorted({f.resolve() for f in found if f.is_file() and not f.name.startswith("~$")})
+    if not files:
+        raise FileNotFoundError(f"Nenhuma planilha encontrada em: {path}")
+    return files
+
+
+def collection_version(path) -> tuple:
+    """Chave de versão do conjunto: (padrão, assinaturas de todos os arquivos)."""
+    return str(path), tuple(file_signature(f) for f in expand_sources(path))
+
+
+def _read_one(path: str, sheet: str, engine: str) -> pd.DataFrame:
+    return load_banco(path, sheet, engine)
+
+
+def read_workbooks(files, sheet: str = SHEET_NAME, engine: str = "stream", max_workers: int = None) -> dict:
+    """{nome do arquivo: DataFrame normalizado}, lendo os arquivos em paralelo."""
+    paths = [str(f) for f in files]
+    names = [Path(f).name for f in files]
+    if len(set(names)) < len(names):
+        names = paths
+    workers = min(len(paths), max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        return dict(zip(names, (_read_one(p, sheet, engine) for p in paths)))
+    try:
+        # spawn: os processos não herdam threads nem travas do app (fork copiaria uma
+        # trava presa por outra thread, como a de core.loader.load_banco, e travaria)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            frames = list(pool.map(_read_one, paths, [sheet] * len(paths), [engine] * len(paths)))
+    except (BrokenProcessPool, OSError):
+        # ambiente sem suporte a processos: lê em sequência
+        frames = [_read_one(p, sheet, engine) for p in paths]
+    return dict(zip(names, frames))
+
+
+def check_schemas(frames: dict) -> None:
+    """Levanta ValueError se as colunas fixas (não mensais) diferirem entre os arquivos."""
+    ref_name, ref = next(iter(frames.items()))
+    expected = [c for c in ref.columns if not MONTH_LABEL.match(c)]
+    for name, df in frames.items():
+        cols = [c for c in df.columns if not MONTH_LABEL.match(c)]
+        if set(cols) != set(expected):
+            missing = sorted(set(expected) - set(cols))
+            extra = sorted(set(cols) - set(expected))
+            raise ValueError(
+                f"A planilha '{name}' não tem as mesmas colunas de '{ref_name}'. "
+                f"Faltando: {', '.join(missing) or '-'}; a mais: {', '.join(extra) or '-'}."
+            )
+
+
+def combine(frames: dict) -> pd.DataFrame:
+    """Concatena as bases com as colunas de origem e período; meses unidos em ordem."""
+    parts = []
+    for name, df in frames.items():
+        months = month_columns(df)
+        period = f"{months[0]} a {months[-1]}" if months else ""
+        parts.append(df.assign(**{SOURCE_COLUMN: name, PERIOD_COLUMN: period}))
+    out = pd.concat(parts, ignore_index=True, sort=False)
+    fixed = [c for c in parts[0].columns if not MONTH_LABEL.match(c) and c not in ("Unidade", SOURCE_COLUMN, PERIOD_COLUMN)]
+    out = out[fixed + month_columns(out) + ["Unidade", SOURCE_COLUMN, PERIOD_COLUMN]]
+    return compact_frame(out, COMPACT_CATEGORIES + [SOURCE_COLUMN, PERIOD_COLUMN], CODE_COLUMNS)
+
+
+@lru_cache(maxsize=2)
+@profiled("várias planilhas")
+def _load_collection(version: tuple, sheet: str, engine: str) -> pd.DataFrame:
+    frames = read_workbooks([sig[0] for sig in version[1]], sheet, engine)
+    check_schemas(frames)
+    return combine(frames)
+
+
+def load_workbooks(path, sheet: str = SHEET_NAME, engine: str = "stream") -> pd.DataFrame:
+    """Base única de todas as planilhas do diretório/padrão, lida uma vez por versão do conjunto."""
+    return _load_collection(collection_version(path), sheet, engine)
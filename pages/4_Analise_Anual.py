@@ -1,10 +1,16 @@
 # app_analise_filiais_gerencial_v2_nosidebar.py
 import streamlit as st
 import pandas as pd
-import numpy as np
-from pathlib import Path
+from core.analytics import MATERIALITY_ABS as MAT_ABS, MATERIALITY_PCT as MAT_PCT, material, yoy_comparison, yoy_pct
+from core.formatting import brl, pct
+from core.loader import FILE_PATH, base_exists
+from ui.export import export_all_button
+from ui.loading import progressive_cube
+from ui.profiling import lap, profile_panel, start_page, stop_page
+from ui.views import annual_view, normalize_filters
 
 st.set_page_config(page_title="Análise Gerencial — 2017 x 2018 por Filial", layout="wide")
+start_page("4_Analise_Anual")
 st.title("📈 Painel Gerencial — Comparativo Acumulado 2017 vs 2018")
 
 # --- Pergunta / enunciado (solicitado)
@@ -13,148 +19,64 @@ st.markdown(
     "comentando sobre os principais impactos ( YTD 2017 x 2018 ) por linha e por filial;"
 )
 
-# ------------------ CONFIG ------------------
-FILE_PATH = Path(
-    r"C:\Users\emiva\OneDrive\Área de Trabalho\Streamlit Sushi Boulevard\Base de Dados - Teste de Gestão de Custos (2).xlsx"
-)
-SHEET_NAME = "Banco"
-
 # ------------------ MATERIALIDADE (fixa, sem sidebar) ------------------
-# Valores padrão mantidos: 5% e R$50.000
-MAT_PCT = 5.0       # percentual mínimo de variação para sinalizar
-MAT_ABS = 50000.0   # valor absoluto mínimo (R$) para sinalizar
+# Valores padrão mantidos (core.analytics): 5% e R$50.000
 
 # ------------------ UTIL ------------------
-def find_col(df, keywords):
-    def norm(s):
-        return "".join(ch for ch in str(s).lower() if ch.isalnum())
-    norm_map = {norm(c): c for c in df.columns}
-    for k in keywords:
-        nk = "".join(ch for ch in k.lower() if ch.isalnum())
-        for n, orig in norm_map.items():
-            if nk in n:
-                return orig
-    return None
-
 def format_brl(x):
-    try:
-        x = float(x)
-    except:
-        return "-"
-    s = f"{x:,.2f}"
-    s = s.replace(",", "X").replace(".", ",").replace("X", ".")
-    return f"R$ {s}"
-
-def safe_pct(old, new):
-    try:
-        old = float(old)
-        new = float(new)
-    except:
-        return np.nan
-    if old == 0:
-        return np.nan
-    return (new - old) / abs(old) * 100
+    return brl(x, na="-")
+
+def format_pct(x):
+    return pct(x, 1, na="—", decimal=".")
 
 # ------------------ LOAD ------------------
-if not FILE_PATH.exists():
+if not base_exists():
     st.error(f"Arquivo não encontrado em:\n{FILE_PATH}\nVerifique o caminho e se o Streamlit tem acesso ao arquivo.")
-    st.stop()
-
-@st.cache_data
-def load_data(path: Path, sheet: str):
-    df = pd.read_excel(path, sheet_name=sheet, header=0)
-    df.columns = [str(c).strip() for c in df.columns]
-    return df
-
-df_raw = load_data(FILE_PATH, SHEET_NAME)
-
-# ------------------ DETECT COLUMNS ------------------
-col_nome_filial = find_col(df_raw, ["Nome Filial", "nome filial", "filial", "nomefilial"])
-col_apenas_dist = find_col(df_raw, ["Apenas_Distribuicao", "Apenas Distribuicao", "apenasdistribuicao", "apenas_distribuicao"])
-col_tot2017 = find_col(df_raw, ["Total 2017", "Total2017", "total_2017", "2017"])
-col_tot2018 = find_col(df_raw, ["Total 2018", "Total2018", "total_2018", "2018"])
-col_ajuste = find_col(df_raw, ["Ajuste Conta", "AjusteConta", "Ajuste", "Rótulos", "Rótulos de Linha", "Rotulos"])
-
-missing = []
-for name, col in [
-    ("Nome Filial", col_nome_filial),
-    ("Apenas_Distribuicao", col_apenas_dist),
-    ("Total 2017", col_tot2017),
-    ("Total 2018", col_tot2018),
-    ("Ajuste Conta", col_ajuste),
-]:
-    if col is None:
-        missing.append(name)
-if missing:
-    st.error("Não foi possível localizar algumas colunas necessárias: " + ", ".join(missing))
-    st.write("Colunas detectadas:", list(df_raw.columns))
-    st.stop()
-
-# ------------------ PREP DATA ------------------
-df = df_raw[[col_nome_filial, col_apenas_dist, col_tot2017, col_tot2018, col_ajuste]].copy()
-df.columns = ["Nome Filial", "Apenas_Distribuicao", "Total 2017", "Total 2018", "Ajuste Conta"]
-
-def to_numeric_col(s):
-    def conv(x):
-        if pd.isna(x):
-            return 0.0
-        if isinstance(x, (int, float, np.number)):
-            return float(x)
-        x = str(x).strip()
-        x = x.replace("R$", "").replace(" ", "")
-        if x.count(",") > 0 and x.count(".") > 0:
-            x = x.replace(".", "").replace(",", ".")
-        else:
-            if x.count(",") > 0 and x.count(".") == 0:
-                x = x.replace(",", ".")
-            if x.count(".") > 0 and x.count(",") == 0:
-                x = x.replace(".", "")
-        try:
-            return float(x)
-        except:
-            try:
-                return float(x.replace(",", "."))
-            except:
-                return 0.0
-    return s.apply(conv)
-
-df["Total 2017"] = to_numeric_col(df["Total 2017"])
-df["Total 2018"] = to_numeric_col(df["Total 2018"])
+    stop_page()
+
+# prévia enquanto a base carrega: YTD por filial e por linha das linhas já lidas (sem filtros)
+def partial_ytd(partial):
+    for title, by in (("Por filial", "Nome Filial"), ("Por linha", "Ajuste Conta")):
+        table = yoy_comparison(partial, by)
+        for c in ("Total 2017", "Total 2018", "Delta Absoluto"):
+            table[c] = format_brl(table[c])
+        table["Delta %"] = format_pct(table["Delta %"])
+        st.markdown(f"**{title} (parcial)**")
+        st.dataframe(table, hide_index=True)
+
+cube = progressive_cube(partial_ytd)
+lap("dados")
 
 # ------------------ SIDEBAR FILTERS ------------------
 st.sidebar.header("Filtros")
-options_status = sorted(df["Apenas_Distribuicao"].dropna().unique().astype(str))
+options_status = sorted(cube["Apenas_Distribuicao"].dropna().unique().astype(str))
 status_choice = st.sidebar.selectbox("Filtrar por 'Apenas_Distribuicao'", options=["(Todos)"] + options_status, index=0)
-filiais = sorted(df["Nome Filial"].dropna().unique().astype(str))
+filiais = sorted(cube["Nome Filial"].dropna().unique().astype(str))
 filiais_selected = st.sidebar.multiselect("Selecionar Filial(s)", options=filiais, default=filiais)
 
-# apply filters
-mask = df["Nome Filial"].astype(str).isin(filiais_selected)
-if status_choice != "(Todos)":
-    mask = mask & (df["Apenas_Distribuicao"].astype(str) == status_choice)
-df_f = df[mask].copy()
-if df_f.empty:
+# apply filters (sobre o cubo pré-agregado; agregados e gráfico memorizados por filtro normalizado)
+view = annual_view(*normalize_filters(status_choice, filiais_selected, filiais, all_label="(Todos)"))
+if view is None:
     st.warning("Não há registros após aplicar os filtros. Ajuste os filtros na barra lateral.")
-    st.stop()
+    stop_page()
+
+lap("filtros e agregação")
 
 # ------------------ AGGREGATE BY FILIAL ------------------
-agg_filial = df_f.groupby("Nome Filial", as_index=False)[["Total 2017", "Total 2018"]].sum()
-agg_filial["Delta Absoluto"] = agg_filial["Total 2018"] - agg_filial["Total 2017"]
-agg_filial["Delta %"] = agg_filial.apply(lambda r: safe_pct(r["Total 2017"], r["Total 2018"]), axis=1)
-agg_filial = agg_filial.sort_values("Total 2018", ascending=False).reset_index(drop=True)
+agg_filial = view.by_filial
 
 total_2017 = agg_filial["Total 2017"].sum()
 total_2018 = agg_filial["Total 2018"].sum()
 total_delta_abs = total_2018 - total_2017
-total_delta_pct = safe_pct(total_2017, total_2018)
+total_delta_pct = yoy_pct(total_2017, total_2018)
 
 # prepare filial display (with Total Geral row)
 display_filial = agg_filial.copy()
 display_filial_form = display_filial[["Nome Filial", "Total 2017", "Total 2018", "Delta Absoluto", "Delta %"]].copy()
-display_filial_form["Total 2017 (R$)"] = display_filial_form["Total 2017"].apply(format_brl)
-display_filial_form["Total 2018 (R$)"] = display_filial_form["Total 2018"].apply(format_brl)
-display_filial_form["Delta Absoluto (R$)"] = display_filial_form["Delta Absoluto"].apply(format_brl)
-display_filial_form["Delta %"] = display_filial_form["Delta %"].apply(lambda x: f"{x:.1f}%" if pd.notna(x) else "—")
+display_filial_form["Total 2017 (R$)"] = format_brl(display_filial_form["Total 2017"])
+display_filial_form["Total 2018 (R$)"] = format_brl(display_filial_form["Total 2018"])
+display_filial_form["Delta Absoluto (R$)"] = format_brl(display_filial_form["Delta Absoluto"])
+display_filial_form["Delta %"] = format_pct(display_filial_form["Delta %"])
 display_filial_form = display_filial_form[["Nome Filial", "Total 2017 (R$)", "Total 2018 (R$)", "Delta Absoluto (R$)", "Delta %"]]
 
 total_row = {
@@ -162,22 +84,19 @@ total_row = {
     "Total 2017 (R$)": format_brl(total_2017),
     "Total 2018 (R$)": format_brl(total_2018),
     "Delta Absoluto (R$)": format_brl(total_delta_abs),
-    "Delta %": (f"{total_delta_pct:.1f}%" if pd.notna(total_delta_pct) else "—")
+    "Delta %": format_pct(total_delta_pct)
 }
 display_filial_with_total = pd.concat([display_filial_form, pd.DataFrame([total_row])], ignore_index=True)
 
 # ------------------ AGGREGATE BY AJUSTE CONTA (Analise por Linha) ------------------
-agg_ajuste = df_f.groupby("Ajuste Conta", as_index=False)[["Total 2017", "Total 2018"]].sum()
-agg_ajuste["Delta Absoluto"] = agg_ajuste["Total 2018"] - agg_ajuste["Total 2017"]
-agg_ajuste["Delta %"] = agg_ajuste.apply(lambda r: safe_pct(r["Total 2017"], r["Total 2018"]), axis=1)
-agg_ajuste = agg_ajuste.sort_values("Total 2018", ascending=False).reset_index(drop=True)
+agg_ajuste = view.by_line
 
 # prepare display and add Total Geral row
 display_ajuste = agg_ajuste.copy()
-display_ajuste["Total 2017 (R$)"] = display_ajuste["Total 2017"].apply(format_brl)
-display_ajuste["Total 2018 (R$)"] = display_ajuste["Total 2018"].apply(format_brl)
-display_ajuste["Delta Absoluto (R$)"] = display_ajuste["Delta Absoluto"].apply(format_brl)
-display_ajuste["Delta %"] = display_ajuste["Delta %"].apply(lambda x: f"{x:.1f}%" if pd.notna(x) else "—")
+display_ajuste["Total 2017 (R$)"] = format_brl(display_ajuste["Total 2017"])
+display_ajuste["Total 2018 (R$)"] = format_brl(display_ajuste["Total 2018"])
+display_ajuste["Delta Absoluto (R$)"] = format_brl(display_ajuste["Delta Absoluto"])
+display_ajuste["Delta %"] = format_pct(display_ajuste["Delta %"])
 display_ajuste = display_ajuste.rename(columns={"Ajuste Conta": "Linha"})
 display_ajuste = display_ajuste[["Linha", "Total 2017 (R$)", "Total 2018 (R$)", "Delta Absoluto (R$)", "Delta %"]]
 
@@ -185,17 +104,19 @@ display_ajuste = display_ajuste[["Linha", "Total 2017 (R$)", "Total 2018 (R$)",
 total_aj_2017 = agg_ajuste["Total 2017"].sum()
 total_aj_2018 = agg_ajuste["Total 2018"].sum()
 total_aj_delta_abs = total_aj_2018 - total_aj_2017
-total_aj_delta_pct = safe_pct(total_aj_2017, total_aj_2018)
+total_aj_delta_pct = yoy_pct(total_aj_2017, total_aj_2018)
 
 total_row_ajuste = {
     "Linha": "Total Geral",
     "Total 2017 (R$)": format_brl(total_aj_2017),
     "Total 2018 (R$)": format_brl(total_aj_2018),
     "Delta Absoluto (R$)": format_brl(total_aj_delta_abs),
-    "Delta %": (f"{total_aj_delta_pct:.1f}%" if pd.notna(total_aj_delta_pct) else "—")
+    "Delta %": format_pct(total_aj_delta_pct)
 }
 display_ajuste_with_total = pd.concat([display_ajuste, pd.DataFrame([total_row_ajuste])], ignore_index=True)
 
+lap("formatação")
+
 # ------------------ EXECUTIVE SUMMARY & KPIs ------------------
 st.header("Resumo Executivo")
 col1, col2, col3 = st.columns([2,1,1])
@@ -212,17 +133,14 @@ with col2:
     st.metric(label="Total 2018", value=format_brl(total_2018))
 
 with col3:
-    pct_display = f"{total_delta_pct:.1f}%" if pd.notna(total_delta_pct) else "—"
-    st.metric(label="Variação YoY", value=pct_display, delta=None)
+    st.metric(label="Variação YoY", value=format_pct(total_delta_pct), delta=None)
 
 st.markdown("---")
 
 # ------------------ TOP DRIVERS (materialidade aplicada) ------------------
 st.subheader("Principais drivers (filiais) — materialidade aplicada")
 flags = agg_filial.copy()
-flags["flag_pct"] = flags["Delta %"].apply(lambda x: abs(x) >= MAT_PCT if pd.notna(x) else False)
-flags["flag_abs"] = flags["Delta Absoluto"].apply(lambda x: abs(x) >= MAT_ABS)
-flags["sinalizar"] = flags["flag_pct"] | flags["flag_abs"]
+flags["sinalizar"] = material(flags, MAT_PCT, MAT_ABS)
 
 top_increases = flags[flags["sinalizar"] & (flags["Delta Absoluto"] > 0)].sort_values("Delta Absoluto", ascending=False).head(5)
 top_decreases = flags[flags["sinalizar"] & (flags["Delta Absoluto"] < 0)].sort_values("Delta Absoluto", ascending=True).head(5)
@@ -269,20 +187,15 @@ for l in rec_lines:
 
 st.markdown("---")
 
+lap("resumo e drivers")
+
 # ------------------ TABELAS E GRÁFICOS ------------------
 st.subheader("Tabela agregada por Filial (Acumulado Anual)")
 st.dataframe(display_filial_with_total.style.format(na_rep="-"), height=420)
 
 st.subheader("Gráfico comparativo — 2017 vs 2018 (por Filial)")
-import altair as alt
-chart_df = agg_filial[["Nome Filial", "Total 2017", "Total 2018"]].melt(id_vars="Nome Filial", var_name="Ano", value_name="Valor")
-chart = alt.Chart(chart_df).mark_bar().encode(
-    x=alt.X('Nome Filial:N', sort=agg_filial["Nome Filial"].tolist(), title='Filial'),
-    y=alt.Y('Valor:Q', title='Valor (R$)'),
-    color='Ano:N',
-    tooltip=[alt.Tooltip('Nome Filial:N'), alt.Tooltip('Ano:N'), alt.Tooltip('Valor:Q', format=',.2f')]
-).properties(height=420, width=1000).interactive()
-st.altair_chart(chart, use_container_width=True)
+st.vega_lite_chart(view.chart, width="stretch")
+lap("gráfico (Altair)")
 
 st.markdown("---")
 st.subheader("Análise por Linha")
@@ -290,10 +203,8 @@ st.dataframe(display_ajuste_with_total.style.format(na_rep="-"), height=320)
 
 # ------------------ ACTIONABLE SUMMARY BY FILIAL ------------------
 st.subheader("Resumo de Ações por Filial (sugestão rápida)")
-for _, r in agg_filial.iterrows():
-    flag_pct = (pd.notna(r["Delta %"]) and abs(r["Delta %"]) >= MAT_PCT)
-    flag_abs = (abs(r["Delta Absoluto"]) >= MAT_ABS)
-    if flag_pct or flag_abs:
+for (_, r), flagged in zip(agg_filial.iterrows(), flags["sinalizar"]):
+    if flagged:
         direction = "Aumento" if r["Delta Absoluto"] > 0 else "Redução"
         st.markdown(f"- **{r['Nome Filial']}** — {direction} material. Ação: investigar lançamentos, validar volumes/contratos. (Prioridade: ALTA)")
     else:
@@ -301,14 +212,14 @@ for _, r in agg_filial.iterrows():
 
 # ------------------ EXPORT ------------------
 st.subheader("Exportar / Baixar resultados")
-export_filial = agg_filial.copy()
-export_filial["Total 2017"] = export_filial["Total 2017"].round(2)
-export_filial["Total 2018"] = export_filial["Total 2018"].round(2)
-csv_filial = export_filial.to_csv(index=False).encode("utf-8")
-st.download_button("📥 Baixar CSV - Agregado por Filial", data=csv_filial, file_name="analise_filial_agregado_gerencial_v2_nosidebar.csv", mime="text/csv")
-
-export_ajuste = agg_ajuste.copy()
-export_ajuste["Total 2017"] = export_ajuste["Total 2017"].round(2)
-export_ajuste["Total 2018"] = export_ajuste["Total 2018"].round(2)
-csv_ajuste = export_ajuste.to_csv(index=False).encode("utf-8")
-st.download_button("📥 Baixar CSV - Agregado por Linha", data=csv_ajuste, file_name="analise_linha_agregado_gerencial_v2_nosidebar.csv", mime="text/csv")
+
+def export_csv(table):
+    """CSV com os totais arredondados; chamado só no clique do download."""
+    return table.round({"Total 2017": 2, "Total 2018": 2}).to_csv(index=False).encode("utf-8")
+
+st.download_button("📥 Baixar CSV - Agregado por Filial", data=lambda: export_csv(agg_filial), file_name="analise_filial_agregado_gerencial_v2_nosidebar.csv", mime="text/csv")
+st.download_button("📥 Baixar CSV - Agregado por Linha", data=lambda: export_csv(agg_ajuste), file_name="analise_linha_agregado_gerencial_v2_nosidebar.csv", mime="text/csv")
+export_all_button()
+
+lap("tabelas e exportação")
+profile_panel()
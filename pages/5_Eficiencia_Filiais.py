@@ -1,169 +1,48 @@
 # streamlit_minha_analise_v3.py
 import streamlit as st
-import pandas as pd
-import numpy as np
-import re
-import unicodedata
-from pathlib import Path
+from core.analytics import EFFICIENCY_WEIGHTS, WEIGHT_GRID_STEP, normalize_weights, weight_grid, weighted_ranking
+from core.formatting import brl, pct
+from core.loader import FILE_PATH, base_exists
+from ui.export import export_all_button
+from ui.profiling import lap, profile_panel, start_page, stop_page
+from ui.views import efficiency_matrix, efficiency_table, efficiency_view, normalize_filters, weight_stability
 
 st.set_page_config(page_title="Análise de Eficiência por Filial", layout="wide")
+start_page("5_Eficiencia_Filiais")
 st.title("✅ Análise de Eficiência por Filial — Acumulado 2017 vs 2018")
 # --- Pergunta / enunciado (solicitado)
 st.markdown(
     "**Pergunta:** Com base nos estudos dos custos realizados, determinar qual  das filiais é a mais eficiente")
 
-# -------- CONFIG (use seu caminho) --------
-FILE_PATH = Path(
-    r"C:\Users\emiva\OneDrive\Área de Trabalho\Streamlit Sushi Boulevard\Base de Dados - Teste de Gestão de Custos (2).xlsx"
-)
-SHEET_NAME = "Banco"
-
-if not FILE_PATH.exists():
+if not base_exists():
     st.error(f"Arquivo não encontrado em:\n{FILE_PATH}\nVerifique o caminho e se o Streamlit tem acesso ao arquivo.")
-    st.stop()
+    stop_page()
 
 # -------- helpers --------
-def norm(s: str) -> str:
-    if s is None:
-        return ""
-    s = str(s)
-    s = ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
-    return re.sub(r'[^a-z0-9]+', '_', s.lower()).strip('_')
-
-def find_col(df, candidates):
-    norm_map = {norm(c): c for c in df.columns}
-    for cand in candidates:
-        cand_norm = norm(cand)
-        for n, orig in norm_map.items():
-            if cand_norm in n:
-                return orig
-    return None
-
-def to_numeric(col):
-    if col is None:
-        return pd.Series(dtype=float)
-    if col.dtype == object or pd.api.types.is_string_dtype(col):
-        s = col.astype(str).fillna("").str.strip()
-        s = s.str.replace(r'[R$\s]', '', regex=True)
-        has_point = s.str.contains(r'\.').any()
-        has_comma = s.str.contains(r',').any()
-        if has_point and has_comma:
-            s = s.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
-        else:
-            s = s.str.replace(',', '.', regex=False)
-        s = s.replace('', np.nan)
-        return pd.to_numeric(s, errors='coerce')
-    else:
-        return pd.to_numeric(col, errors='coerce')
-
 def fmt_br_money(v):
-    try:
-        if pd.isna(v):
-            return "R$ 0,00"
-        s = f"{float(v):,.2f}"          # "1,234,567.89"
-        s = s.replace(",", "X").replace(".", ",").replace("X", ".")  # -> "1.234.567,89"
-        return f"R$ {s}"
-    except:
-        return "R$ 0,00"
-
-def min_max_norm(s):
-    if s.max() == s.min():
-        return pd.Series(0.0, index=s.index)
-    return (s - s.min()) / (s.max() - s.min())
-
-# -------- load sheet (detecção robusta de cabeçalho) --------
-raw = pd.read_excel(FILE_PATH, sheet_name=SHEET_NAME, header=None)
-header_idx = None
-for i, row in raw.iterrows():
-    if row.dropna().shape[0] > 0:
-        header_idx = i
-        break
+    return brl(v, na="R$ 0,00")
 
-if header_idx is None:
-    st.error("Não foi possível detectar um cabeçalho na planilha.")
-    st.stop()
+def fmt_pct(v, scale=1.0):
+    return pct(v, 2, decimal=".", scale=scale)
 
-raw.columns = list(range(raw.shape[1]))
-header = raw.iloc[header_idx].fillna('').astype(str).str.strip()
-df = raw.iloc[header_idx + 1 :].copy()
-df.columns = header
-df = df.loc[:, df.notna().any(axis=0)]
-df = df.reset_index(drop=True)
-
-# -------- identificar colunas --------
-col_nome_filial = find_col(df, ["nome filial", "nome_filial", "filial", "nome filial normalizado", "nome"])
-col_apenas_dist = find_col(df, ["apenas_distribuicao", "apenas distribuicao", "apenas distribuição", "apenas", "distribuicao", "distribuição"])
-col_total_2017 = find_col(df, ["total 2017", "total2017", "total_2017", "2017"])
-col_total_2018 = find_col(df, ["total 2018", "total2018", "total_2018", "2018"])
-
-if col_nome_filial is None:
-    st.error("Não encontrei a coluna de 'Nome Filial'. Verifique o nome da coluna na planilha.")
-    st.stop()
-if col_total_2017 is None or col_total_2018 is None:
-    st.error("Não encontrei as colunas 'Total 2017' e/ou 'Total 2018'. Verifique os nomes na planilha.")
-    st.stop()
-
-# padroniza nome filial
-df = df.rename(columns={col_nome_filial: "Nome Filial"})
-
-# converte totais em numérico
-df[col_total_2017] = to_numeric(df[col_total_2017])
-df[col_total_2018] = to_numeric(df[col_total_2018])
-
-# criar flag apenas distribuição (se existir coluna)
-if col_apenas_dist is not None:
-    s_flag = df[col_apenas_dist].astype(str).str.lower().str.strip()
-    df["_apenas_dist_bool"] = s_flag.isin(["sim","s","true","1","yes","y"]) | s_flag.str.contains("distrib", na=False)
-else:
-    df["_apenas_dist_bool"] = False
+# -------- agregação por filial, métricas e score (pesos fixos, sem controles no sidebar) --------
+# (sobre o cubo de custos da base compartilhada; erros de leitura da base aparecem aqui)
+try:
+    agg = efficiency_table()
+except ValueError as e:
+    st.error(str(e))
+    stop_page()
 
-# -------- agregação por filial --------
-agg = df.groupby("Nome Filial", dropna=False).agg(
-    Total_2017 = (col_total_2017, "sum"),
-    Total_2018 = (col_total_2018, "sum")
-).reset_index()
-
-apenas = df[df["_apenas_dist_bool"]].groupby("Nome Filial", dropna=False).agg(
-    Apenas_Distribuicao_2018 = (col_total_2018, "sum")
-).reset_index()
-
-agg = agg.merge(apenas, on="Nome Filial", how="left")
-agg["Apenas_Distribuicao_2018"] = agg["Apenas_Distribuicao_2018"].fillna(0.0)
-agg["Total_2017"] = agg["Total_2017"].fillna(0.0)
-agg["Total_2018"] = agg["Total_2018"].fillna(0.0)
-
-# -------- métricas --------
-agg["Delta_Abs"] = agg["Total_2018"] - agg["Total_2017"]
-agg["Delta_Pct"] = np.where(agg["Total_2017"] == 0, np.nan,
-                            (agg["Total_2018"] - agg["Total_2017"]) / agg["Total_2017"] * 100)
-agg["Distrib_Share"] = np.where(agg["Total_2018"] == 0, 0.0,
-                                agg["Apenas_Distribuicao_2018"] / agg["Total_2018"])
-
-# normalizações e score (mesma lógica)
-agg["total2018_norm"] = min_max_norm(agg["Total_2018"])
-agg["improvement"] = np.where(agg["Total_2017"] == 0, 0.0,
-                              (agg["Total_2017"] - agg["Total_2018"]) / agg["Total_2017"])
-agg["improvement_norm"] = min_max_norm(agg["improvement"])
-agg["dist_share_norm"] = min_max_norm(agg["Distrib_Share"])
-
-# Efficiency Score: pesos fixos (sem controles no sidebar)
-w_total, w_improv, w_dist = 0.60, 0.30, 0.10
-agg["Efficiency_Score"] = (
-    w_total * agg["total2018_norm"]
-    + w_improv * (1 - agg["improvement_norm"])
-    + w_dist * agg["dist_share_norm"]
-)
-
-agg = agg.sort_values("Efficiency_Score").reset_index(drop=True)
+lap("score")
 
 # -------- único filtro no sidebar: filiais --------
 st.sidebar.markdown("### Filiais")
 filiais_all = agg["Nome Filial"].dropna().astype(str).tolist()
 selected_filials = st.sidebar.multiselect("", options=filiais_all, default=filiais_all)
 
-filtered = agg.copy()
-if selected_filials:
-    filtered = filtered[filtered["Nome Filial"].isin(selected_filials)]
+# subconjunto e bases dos gráficos memorizados por seleção (vazia = todas)
+view = efficiency_view(normalize_filters(None, selected_filials, filiais_all)[1])
+filtered = view.filtered
 
 # -------- exibição tabela --------
 st.subheader("Tabela resumida por filial (ordenada por Efficiency Score — menor melhor)")
@@ -171,12 +50,12 @@ display = filtered[[
     "Nome Filial", "Total_2017", "Total_2018", "Apenas_Distribuicao_2018", "Delta_Abs", "Delta_Pct", "Distrib_Share", "Efficiency_Score"
 ]].copy()
 
-display["Total 2017"] = display["Total_2017"].map(fmt_br_money)
-display["Total 2018"] = display["Total_2018"].map(fmt_br_money)
-display["Apenas Distribuição (2018)"] = display["Apenas_Distribuicao_2018"].map(fmt_br_money)
-display["Delta Absoluto"] = display["Delta_Abs"].map(fmt_br_money)
-display["Δ %"] = display["Delta_Pct"].map(lambda v: "" if pd.isna(v) else f"{v:.2f}%")
-display["Distrib Share"] = display["Distrib_Share"].map(lambda v: f"{v:.2%}")
+display["Total 2017"] = fmt_br_money(display["Total_2017"])
+display["Total 2018"] = fmt_br_money(display["Total_2018"])
+display["Apenas Distribuição (2018)"] = fmt_br_money(display["Apenas_Distribuicao_2018"])
+display["Delta Absoluto"] = fmt_br_money(display["Delta_Abs"])
+display["Δ %"] = fmt_pct(display["Delta_Pct"])
+display["Distrib Share"] = fmt_pct(display["Distrib_Share"], 100)
 display["Efficiency Score"] = display["Efficiency_Score"].map(lambda v: f"{v:.4f}")
 
 display = display[[
@@ -186,17 +65,18 @@ display = display[[
 
 st.dataframe(display, height=420)
 
+lap("tabela")
+
 # -------- Top5 / Bottom5 charts (verticais, um embaixo do outro) --------
 st.markdown("---")
 st.subheader("Top 5 — Mais eficientes (Total 2018)")
 top5 = filtered.head(5).copy()
 if not top5.empty:
-    top5_chart = top5.set_index("Nome Filial")[["Total_2018"]].sort_values("Total_2018", ascending=True)
-    st.bar_chart(top5_chart)
+    st.bar_chart(view.top5)
     top5_vis = top5[["Nome Filial","Total_2018","Delta_Pct","Distrib_Share","Efficiency_Score"]].copy()
-    top5_vis["Total 2018"] = top5_vis["Total_2018"].map(fmt_br_money)
-    top5_vis["Δ %"] = top5_vis["Delta_Pct"].map(lambda v: "" if pd.isna(v) else f"{v:.2f}%")
-    top5_vis["Distrib Share"] = top5_vis["Distrib_Share"].map(lambda v: f"{v:.2%}")
+    top5_vis["Total 2018"] = fmt_br_money(top5_vis["Total_2018"])
+    top5_vis["Δ %"] = fmt_pct(top5_vis["Delta_Pct"])
+    top5_vis["Distrib Share"] = fmt_pct(top5_vis["Distrib_Share"], 100)
     top5_vis["Efficiency Score"] = top5_vis["Efficiency_Score"].map(lambda v: f"{v:.4f}")
     st.table(top5_vis.rename(columns={"Nome Filial":"Filial"}))
 else:
@@ -206,17 +86,18 @@ st.markdown("---")
 st.subheader("Top 5 — Menos eficientes (Total 2018)")
 bottom5 = filtered.tail(5).copy()
 if not bottom5.empty:
-    bottom5_chart = bottom5.set_index("Nome Filial")[["Total_2018"]].sort_values("Total_2018", ascending=False)
-    st.bar_chart(bottom5_chart)
+    st.bar_chart(view.bottom5)
     bottom5_vis = bottom5[["Nome Filial","Total_2018","Delta_Pct","Distrib_Share","Efficiency_Score"]].copy()
-    bottom5_vis["Total 2018"] = bottom5_vis["Total_2018"].map(fmt_br_money)
-    bottom5_vis["Δ %"] = bottom5_vis["Delta_Pct"].map(lambda v: "" if pd.isna(v) else f"{v:.2f}%")
-    bottom5_vis["Distrib Share"] = bottom5_vis["Distrib_Share"].map(lambda v: f"{v:.2%}")
+    bottom5_vis["Total 2018"] = fmt_br_money(bottom5_vis["Total_2018"])
+    bottom5_vis["Δ %"] = fmt_pct(bottom5_vis["Delta_Pct"])
+    bottom5_vis["Distrib Share"] = fmt_pct(bottom5_vis["Distrib_Share"], 100)
     bottom5_vis["Efficiency Score"] = bottom5_vis["Efficiency_Score"].map(lambda v: f"{v:.4f}")
     st.table(bottom5_vis.rename(columns={"Nome Filial":"Filial"}))
 else:
     st.info("Bottom 5 vazio — ajuste os filtros.")
 
+lap("gráficos")
+
 # -------- análise automática (texto) --------
 st.markdown("---")
 st.subheader("Análise — quem é mais eficiente e por quê")
@@ -236,19 +117,19 @@ else:
     worst_share = worst["Distrib_Share"]
     worst_score = worst["Efficiency_Score"]
 
-    best_delta_str = "" if pd.isna(best_delta) else f"{best_delta:.2f}%"
-    worst_delta_str = "" if pd.isna(worst_delta) else f"{worst_delta:.2f}%"
+    best_delta_str = fmt_pct(best_delta)
+    worst_delta_str = fmt_pct(worst_delta)
 
     st.markdown(f"**Filial mais eficiente (score mais baixo):** **{best['Nome Filial']}**")
     st.write(f"- Total 2018: **{fmt_br_money(best_total2018)}**")
     st.write(f"- Variação 2017→2018: **{best_delta_str}**")
-    st.write(f"- Share Frete (Apenas Distribuição / Total 2018): **{best_share:.2%}**")
+    st.write(f"- Share Frete (Apenas Distribuição / Total 2018): **{fmt_pct(best_share, 100)}**")
     st.write(f"- Efficiency Score: **{best_score:.4f}**")
 
     st.markdown(f"**Filial menos eficiente (score mais alto):** **{worst['Nome Filial']}**")
     st.write(f"- Total 2018: **{fmt_br_money(worst_total2018)}**")
     st.write(f"- Variação 2017→2018: **{worst_delta_str}**")
-    st.write(f"- Share Frete (Apenas Distribuição / Total 2018): **{worst_share:.2%}**")
+    st.write(f"- Share Frete (Apenas Distribuição / Total 2018): **{fmt_pct(worst_share, 100)}**")
     st.write(f"- Efficiency Score: **{worst_score:.4f}**")
 
     st.markdown("### Observações gerenciais")
@@ -256,7 +137,57 @@ else:
     st.write("- Atenção: filiais com baixo volume absoluto podem aparecer eficientes — ideal normalizar por volume/entregas.")
     st.write("- Recomendação: verificar composição por grupo (RH, Frete, Manutenção) para entender origem da eficiência.")
 
+# -------- sensibilidade dos pesos (what-if) --------
+st.markdown("---")
+st.subheader("Sensibilidade dos pesos (what-if)")
+with st.expander("E se os pesos do score fossem outros? (todas as filiais)", expanded=False):
+    c1, c2, c3 = st.columns(3)
+    w_total = c1.slider("Peso — custo total 2018", 0.0, 1.0, EFFICIENCY_WEIGHTS[0], WEIGHT_GRID_STEP)
+    w_improv = c2.slider("Peso — melhoria 2017→2018", 0.0, 1.0, EFFICIENCY_WEIGHTS[1], WEIGHT_GRID_STEP)
+    w_dist = c3.slider("Peso — participação da distribuição", 0.0, 1.0, EFFICIENCY_WEIGHTS[2], WEIGHT_GRID_STEP)
+    if w_total + w_improv + w_dist <= 0:
+        st.warning("Defina ao menos um peso maior que zero.")
+    else:
+        weights = tuple(round(float(w), 6) for w in normalize_weights((w_total, w_improv, w_dist)))
+        st.caption(
+            f"Pesos normalizados (somam 100%): custo {fmt_pct(weights[0], 100)}, "
+            f"melhoria {fmt_pct(weights[1], 100)}, distribuição {fmt_pct(weights[2], 100)}."
+        )
+        # novo score = matriz de componentes (calculada uma vez) × pesos
+        what_if = weighted_ranking(efficiency_matrix(), weights)
+        current_rank = {str(name): i + 1 for i, name in enumerate(agg["Nome Filial"])}
+        what_if["Rank atual"] = what_if["Nome Filial"].astype(str).map(current_rank)
+        moved = what_if["Rank atual"] - what_if["Rank"]
+        st.dataframe(
+            what_if.assign(**{
+                "Score (what-if)": what_if["Score"].map(lambda v: f"{v:.4f}"),
+                "Variação": moved.map(lambda v: f"▲ {v}" if v > 0 else f"▼ {-v}" if v < 0 else "="),
+            })[["Nome Filial", "Rank", "Rank atual", "Variação", "Score (what-if)"]]
+            .rename(columns={"Nome Filial": "Filial", "Rank": "Rank (what-if)"}),
+            hide_index=True,
+        )
+
+        n_scenarios = len(weight_grid())
+        st.markdown(
+            f"**Estabilidade do rank** — {n_scenarios} combinações de pesos (passo {WEIGHT_GRID_STEP:.2f}); "
+            "amplitude pequena = posição robusta à escolha dos pesos."
+        )
+        stability = weight_stability(weights)
+        top_col = [c for c in stability.columns if c.startswith("% no top")][0]
+        st.dataframe(
+            stability.assign(**{
+                "Rank mediano": stability["Rank mediano"].map(lambda v: f"{v:.1f}"),
+                top_col: fmt_pct(stability[top_col], 1),
+            }).rename(columns={"Nome Filial": "Filial"}),
+            hide_index=True,
+        )
+
+lap("what-if de pesos")
+
 # -------- export --------
 st.markdown("---")
-csv = agg.to_csv(index=False, sep=';')
-st.download_button("Exportar ranking completo (CSV ; )", data=csv, file_name="ranking_eficiencia_filiais.csv", mime="text/csv")
\ No newline at end of file
+st.download_button("Exportar ranking completo (CSV ; )", data=lambda: agg.to_csv(index=False, sep=';'), file_name="ranking_eficiencia_filiais.csv", mime="text/csv")
+export_all_button()
+
+lap("análise e exportação")
+profile_panel()
@@ -0,0 +1,65 @@
+# tests/test_export.py
+"""Índices das tabelas nos CSVs (core.report) e no .xlsx (core.export).
+
+O ranking de run_all tem o índice "Ranking" 1..n; no pandas 3 ele vira um
+RangeIndex com nome, que não pode ser confundido com o 0..n-1 do
+reset_index (esse fica fora dos arquivos).
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from core.analytics import cost_ranking  # noqa: E402
+from core.cube import build_cube  # noqa: E402
+from core.export import has_index, write_xlsx  # noqa: E402
+from core.report import write_reports  # noqa: E402
+
+
+@pytest.fixture
+def tables() -> dict:
+    """Ranking como em run_all, de uma base mínima já normalizada, e uma tabela com índice 0..n-1."""
+    df = pd.DataFrame({
+        "Conta Contábil": pd.array([8401, 5101, 8402], dtype="Int64"),
+        "Nome Filial": ["Ananindeua", "Imperatriz", "Ananindeua"],
+        "Unidade": ["Ananindeua", "Imperatriz", "Ananindeua"],
+        "Apenas_Distribuicao": ["Distribuição", "Outras Areas", "Distribuição"],
+        "Ajuste Conta": ["Frete", "RH", "Frete"],
+        "Total 2017": [10.0, 50.0, 5.0],
+        "Total 2018": [20.0, 30.0, 1.0],
+    })
+    return {
+        "1_ranking_custos": cost_ranking(build_cube(df)).set_index("Ranking"),
+        "4_anual_filial": pd.DataFrame({"Nome Filial": ["Imperatriz", "Ananindeua"], "Total 2018": [30.0, 21.0]}),
+    }
+
+
+def test_has_index(tables):
+    assert has_index(tables["1_ranking_custos"])
+    assert not has_index(tables["4_anual_filial"])
+
+
+def test_csv_keeps_ranking(tables, tmp_path):
+    paths = {p.stem: p for p in write_reports(tables, tmp_path)}
+    ranking = paths["1_ranking_custos"].read_text(encoding="utf-8-sig").splitlines()
+    assert ranking[0].split(";")[:2] == ["Ranking", "Nome Filial"]
+    assert [line.split(";")[0] for line in ranking[1:]] == ["1", "2"]
+    annual = paths["4_anual_filial"].read_text(encoding="utf-8-sig").splitlines()
+    assert annual[0].split(";") == ["Nome Filial", "Total 2018"]
+
+
+def test_xlsx_keeps_ranking(tables, tmp_path):
+    target = tmp_path / "analises.xlsx"
+    write_xlsx(tables, target)
+    wb = load_workbook(target, read_only=True)
+    try:
+        ranking = list(wb["1_ranking_custos"].iter_rows(values_only=True))
+        annual = list(wb["4_anual_filial"].iter_rows(max_row=1, values_only=True))
+    finally:
+        wb.close()
+    assert list(ranking[0][:2]) == ["Ranking", "Nome Filial"]
+    assert [row[0] for row in ranking[1:]] == [1, 2]
+    assert list(annual[0]) == ["Nome Filial", "Total 2018"]
@@ -0,0 +1,4 @@
+"""Componentes de interface (Streamlit) compartilhados pelas páginas."""
+from ui.tables import paged_table
+
+__all__ = ["paged_table"]
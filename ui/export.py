@@ -0,0 +1,36 @@
+# ui/export.py
+"""Exportação de todas as análises em um .xlsx (core.export), montado só no clique.
+
+O botão recebe uma função em vez dos bytes: nada é calculado nas execuções
+normais da página. No primeiro clique de cada versão da base as tabelas de
+core.analytics.run_all são geradas e gravadas; cliques seguintes reaproveitam
+o arquivo.
+"""
+import streamlit as st
+
+from core.analytics import run_all
+from core.cube import get_cube
+from core.export import MIME_XLSX, xlsx_bytes
+from core.loader import load_banco, versioned
+
+FILE_NAME = "analises_custos_distribuicao.xlsx"
+
+
+@versioned(maxsize=2)
+def analyses_workbook(path, sheet) -> bytes:
+    """Todas as análises da versão atual da base em um .xlsx (uma aba por tabela)."""
+    return xlsx_bytes(run_all(load_banco(path, sheet), get_cube(path=path, sheet=sheet)))
+
+
+def export_all_button(key: str = "exportar_excel") -> None:
+    """Botão de download do .xlsx com todas as análises."""
+    st.download_button(
+        "📥 Exportar todas as análises (Excel)",
+        data=lambda: analyses_workbook(),
+        file_name=FILE_NAME,
+        mime=MIME_XLSX,
+        key=key,
+        on_click="ignore",
+        help="Ranking, representatividade, matrizes mensais, YTD por filial e por linha, "
+             "eficiência e itens de frete — uma aba por análise.",
+    )
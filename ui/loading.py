@@ -0,0 +1,125 @@
+# ui/loading.py
+"""Carga da base em segundo plano, com progresso e resultados parciais.
+
+Numa planilha grande a leitura leva segundos e a página ficava em branco.
+start_loading() lê a base numa thread (uma vez por versão da base e por
+processo) recebendo os blocos já tipados da leitura (core.loader.
+reporting_chunks) e somando cada um a um cubo parcial (build_cube/fold_cube).
+progressive_cube() é o que as páginas 1 e 4 chamam no lugar de get_cube():
+enquanto a carga não termina, mostra uma barra de progresso e redesenha uma
+prévia com o cubo parcial a cada bloco; no fim, apaga ambas e devolve o cubo
+completo. Com snapshot em disco ou base já em memória a carga é imediata e
+nada disso aparece. As demais páginas chamam get_cube() direto; se abrirem
+durante a carga, esperam por ela (core.loader.load_banco lê cada versão uma
+única vez, mesmo com chamadas simultâneas).
+"""
+import threading
+import time
+from typing import NamedTuple
+
+import pandas as pd
+import streamlit as st
+
+from core.cube import build_cube, fold_cube, get_cube
+from core.loader import SHEET_NAME, dataset_version, load_banco, reporting_chunks
+
+POLL_SECONDS = 0.3
+QUICK_SECONDS = 0.2   # espera inicial: cargas rápidas não chegam a mostrar a barra
+
+
+class Progress(NamedTuple):
+    rows: int             # linhas de dados já percorridas
+    total: int            # total estimado pela dimensão da aba (None = desconhecido)
+    cube: pd.DataFrame    # cubo parcial das linhas já lidas (None antes do primeiro bloco)
+
+
+class Loading:
+    """Carga da base de uma versão: thread, progresso e cubo parcial."""
+
+    def __init__(self, path, sheet: str):
+        self._lock = threading.Lock()
+        self._progress = Progress(0, None, None)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, args=(path, sheet), name="loading", daemon=True)
+
+    def _on_chunk(self, rows: pd.DataFrame, read: int, total: int):
+        cube = build_cube(rows)
+        if self._progress.cube is not None:
+            cube = fold_cube(self._progress.cube, cube)
+        with self._lock:
+            self._progress = Progress(read, total, cube)
+
+    def _run(self, path, sheet: str):
+        try:
+            with reporting_chunks(self._on_chunk):
+                load_banco(path, sheet)
+            get_cube(path=path, sheet=sheet)
+        except Exception as e:  # repassada a quem esperar pela carga (wait)
+            self.error = e
+        finally:
+            with self._lock:
+                # com o cubo completo em cache, o parcial não serve mais
+                self._progress = self._progress._replace(cube=None)
+
+    @property
+    def done(self) -> bool:
+        return not self.thread.is_alive()
+
+    def progress(self) -> Progress:
+        with self._lock:
+            return self._progress
+
+    def wait(self, timeout: float = None) -> bool:
+        """Espera a carga terminar (até `timeout` s); levanta o erro da carga, se houve."""
+        self.thread.join(timeout)
+        if self.done and self.error is not None:
+            raise self.error
+        return self.done
+
+
+# (versão da base, aba) -> Loading
+_RUNS = {}
+_LOCK = threading.Lock()
+
+
+def start_loading(path=None, sheet: str = SHEET_NAME) -> Loading:
+    """Carga da versão atual da base, disparada na primeira chamada (ou de novo após uma falha)."""
+    key = (dataset_version(path), sheet)
+    with _LOCK:
+        load = _RUNS.get(key)
+        if load is None or (load.done and load.error is not None):
+            load = _RUNS[key] = Loading(path, sheet)
+            load.thread.start()
+        return load
+
+
+def progress_text(p: Progress) -> str:
+    """'Lendo a base: 25.000 de ~100.000 linhas' (sem o total se a aba não informa a dimensão)."""
+    if not p.rows:
+        return "Lendo a base…"
+    count = lambda n: f"{n:,}".replace(",", ".")
+    return f"Lendo a base: {count(p.rows)}" + (f" de ~{count(p.total)}" if p.total else "") + " linhas"
+
+
+def progressive_cube(preview=None) -> pd.DataFrame:
+    """Cubo completo da base atual; enquanto ela carrega, mostra o progresso e preview(cubo parcial).
+
+    preview é chamada dentro de um container que é redesenhado a cada bloco
+    lido (não deve criar widgets com key). Erros da leitura são levantados aqui.
+    """
+    load = start_loading()
+    if not load.wait(QUICK_SECONDS):
+        bar, slot, shown = st.progress(0.0, text=progress_text(Progress(0, None, None))), st.empty(), 0
+        while not load.done:
+            p = load.progress()
+            bar.progress(min(p.rows / p.total, 0.99) if p.total else 0.0, text=progress_text(p))
+            if preview is not None and p.cube is not None and p.rows != shown:
+                with slot.container():
+                    st.caption("Resultado parcial — atualizado a cada bloco lido; filtros disponíveis ao fim da leitura.")
+                    preview(p.cube)
+                shown = p.rows
+            time.sleep(POLL_SECONDS)
+        bar.empty()
+        slot.empty()
+        load.wait()
+    return get_cube()
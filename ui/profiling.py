@@ -0,0 +1,49 @@
+# ui/profiling.py
+"""Painel de tempo por etapa (core.profiling) nas páginas.
+
+No topo da página: start_page("nome"); entre os blocos: lap("etapa"); no fim:
+profile_panel(). Saídas antecipadas (aviso/erro) usam stop_page() no lugar de
+st.stop(), para que essas execuções também sejam medidas e registradas. Só
+mede com ?perfil=1 na URL ou DASH_PROFILE=1 no ambiente.
+"""
+import pandas as pd
+import streamlit as st
+
+from core import profiling
+from core.profiling import lap  # noqa: F401  (reexportado para as páginas)
+
+QUERY_PARAM = "perfil"
+
+
+def start_page(name: str):
+    """Liga o profiler desta execução da página, se pedido; devolve o Profiler ou None."""
+    if profiling.env_enabled() or profiling.enabled_by(st.query_params.get(QUERY_PARAM)):
+        return profiling.start(name)
+    return None
+
+
+def profile_panel() -> None:
+    """Fecha a medição, grava no log JSONL e mostra as etapas em um expander."""
+    profiler = profiling.stop()
+    if profiler is None:
+        return
+    try:
+        profiler.write()
+    except OSError as e:
+        st.caption(f"Não foi possível gravar o log de tempos: {e}")
+    table = pd.DataFrame({
+        "Etapa": ["\u2003" * s["depth"] + s["stage"] for s in profiler.stages],  # recuo pela profundidade
+        "Origem": [s["kind"] for s in profiler.stages],
+        "Início (ms)": [s["start"] * 1000 for s in profiler.stages],
+        "Duração (ms)": [s["seconds"] * 1000 for s in profiler.stages],
+    })
+    with st.expander(f"⏱️ Tempo por etapa — {profiler.total * 1000:.0f} ms", expanded=False):
+        st.dataframe(table.style.format({"Início (ms)": "{:.1f}", "Duração (ms)": "{:.1f}"}),
+                     hide_index=True, width="stretch")
+        st.caption(f"Registrado em {profiling.LOG_PATH}")
+
+
+def stop_page() -> None:
+    """st.stop() que antes fecha a medição da execução (profile_panel)."""
+    profile_panel()
+    st.stop()
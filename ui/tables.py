@@ -0,0 +1,85 @@
+# ui/tables.py
+"""Tabelas de resultado ordenadas e paginadas no servidor.
+
+st.table e DataFrame.to_html mandam todas as linhas para o navegador de uma
+vez; com milhares de filiais/contas a página trava. paged_table ordena pelos
+valores numéricos no servidor, formata só a fatia visível e envia só ela. A
+linha de total (da tabela inteira) fecha cada página. Os formatadores recebem
+a coluna inteira da fatia (core.formatting.brl/pct) ou um valor escalar. Tabelas que cabem em uma
+página saem como antes, sem controles.
+"""
+import math
+
+import pandas as pd
+import streamlit as st
+
+PAGE_SIZE = 50
+ORIGINAL_ORDER = "(ordem original)"
+HTML_OPTIONS = dict(index=False, justify="left", classes="table table-striped", border=0)
+
+
+def sort_rows(data: pd.DataFrame, by=None, descending: bool = False) -> pd.DataFrame:
+    """Linhas ordenadas por `by` (valores brutos, vazios por último); by=None mantém a ordem."""
+    if by is None:
+        return data
+    return data.sort_values(by, ascending=not descending, kind="stable", na_position="last")
+
+
+def format_rows(rows: pd.DataFrame, formats: dict) -> pd.DataFrame:
+    """Aplica {coluna: formatador de coluna} às linhas informadas (só a fatia visível)."""
+    out = rows.copy()
+    for col, fmt in (formats or {}).items():
+        if col in out:
+            out[col] = fmt(out[col])
+    return out
+
+
+def total_frame(total: dict, formats: dict, label) -> pd.DataFrame:
+    """Linha de total formatada, com `label` no índice."""
+    formats = formats or {}
+    return pd.DataFrame([{c: formats[c](v) if c in formats else v for c, v in total.items()}], index=[label])
+
+
+def _page_controls(key: str, columns, rows: int, page_size: int) -> tuple:
+    """Widgets de ordenação e página -> (coluna ou None, decrescente, página 1..n)."""
+    pages = math.ceil(rows / page_size)
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        # a base encolheu desde a última interação
+        st.session_state[page_key] = pages
+    c1, c2, c3 = st.columns([3, 1, 1])
+    by = c1.selectbox("Ordenar por", [ORIGINAL_ORDER] + list(columns), key=f"{key}_sort")
+    descending = c2.toggle("Decrescente", value=True, key=f"{key}_desc")
+    page = c3.number_input("Página", min_value=1, max_value=pages, value=1, step=1, key=page_key)
+    return (None if by == ORIGINAL_ORDER else by), descending, int(page)
+
+
+def paged_table(data: pd.DataFrame, *, key: str, formats: dict = None, total: dict = None,
+                total_label="Total Geral", index: bool = True, html: bool = False,
+                page_size: int = PAGE_SIZE) -> None:
+    """Exibe `data` (valores numéricos) em páginas de `page_size` linhas.
+
+    formats: {coluna: função Series -> textos} aplicada só às linhas exibidas
+    (e, com um escalar, ao valor da linha de total).
+    total: {coluna: valor} da linha de total, formatada igual e exibida no fim
+    de cada página (com total_label no índice). index=False troca o índice pela
+    posição da linha; html=True exibe como tabela HTML (to_html) em vez de st.table.
+    """
+    start, rows = 0, data
+    if len(data) > page_size:
+        by, descending, page = _page_controls(key, data.columns, len(data), page_size)
+        start = (page - 1) * page_size
+        rows = sort_rows(data, by, descending).iloc[start:start + page_size]
+        st.caption(f"Linhas {start + 1}–{start + len(rows)} de {len(data)}")
+
+    shown = format_rows(rows, formats)
+    if not index:
+        shown.index = pd.RangeIndex(start, start + len(shown))
+        total_label = len(data)
+    if total is not None:
+        shown = pd.concat([shown, total_frame(total, formats, total_label)])
+
+    if html:
+        st.markdown(shown.to_html(**HTML_OPTIONS), unsafe_allow_html=True)
+    else:
+        st.table(shown)
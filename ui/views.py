@@ -0,0 +1,160 @@
+# ui/views.py
+"""Resultados memorizados das páginas (uma vez por versão da base).
+
+Páginas 1 a 3 guardam o resultado do filtro padrão (e, na 1, de cada status);
+páginas 4 e 5 têm filtros na barra lateral. Cada combinação de filtro (status de Apenas_Distribuicao, conjunto de filiais)
+é calculada uma vez por versão da base e guardada em um LRU limitado
+(core.loader.versioned): voltar a uma seleção anterior não recalcula nada.
+O filtro é normalizado antes de virar chave: ordem das filiais não importa e
+"todas selecionadas" é o mesmo que sem filtro. Os objetos devolvidos são
+compartilhados entre execuções; as páginas não devem alterá-los in-place.
+
+Uma seleção nova não volta ao cubo: a página 4 parte das contribuições por
+filial (core.analytics.filial_contributions, uma vez por status) e só soma ou
+subtrai as filiais que mudaram desde a última seleção; a página 5 recorta os
+scores por filial já calculados.
+"""
+import threading
+from typing import NamedTuple
+
+import altair as alt
+import pandas as pd
+
+from core.analytics import (EFFICIENCY_WEIGHTS, LINE_ORDER, WEIGHT_GRID_STEP, SelectionTotals, area_split, area_totals,
+                            cost_ranking, efficiency_components, efficiency_scores, filial_contributions,
+                            freight_shares, line_totals, monthly_tables, monthly_trends, rank_stability, weight_grid,
+                            yoy_table)
+from core.cube import get_cube
+from core.loader import versioned
+
+FILTER_CACHE_SIZE = 32
+
+
+def normalize_filters(status, selected, options, all_label=None) -> tuple:
+    """(status ou None, frozenset de filiais ou None) com None = sem filtro."""
+    status = None if status is None or status == all_label else str(status)
+    selected = frozenset(map(str, selected))
+    return status, (None if selected == frozenset(map(str, options)) else selected)
+
+
+# ---------- páginas 1 a 3 ----------
+@versioned(maxsize=FILTER_CACHE_SIZE)
+def ranking_table(path, sheet, status=None):
+    """cost_ranking da página 1 para um status de Apenas_Distribuicao (None = todos)."""
+    return cost_ranking(get_cube(path=path, sheet=sheet), status)
+
+
+class AreaView(NamedTuple):
+    totals: pd.DataFrame      # area_totals: Distribuição, Outras Áreas, Total Geral
+    freight: pd.Series        # freight_shares
+    by_line: pd.DataFrame     # area_split por Ajuste Conta (LINE_ORDER primeiro)
+
+
+@versioned
+def area_view(path, sheet):
+    """Totais por área, participação do frete e divisão por Ajuste Conta (página 2)."""
+    cube = get_cube(path=path, sheet=sheet)
+    return AreaView(area_totals(cube), freight_shares(cube), area_split(cube, "Ajuste Conta", order=LINE_ORDER))
+
+
+class MonthlyView(NamedTuple):
+    table: pd.DataFrame       # filial × mês no layout da dinâmica (monthly_tables)
+    trends: pd.DataFrame      # monthly_trends da tabela
+
+
+@versioned
+def monthly_view(path, sheet):
+    """{Ajuste Conta: MonthlyView} da página 3 (somente distribuição)."""
+    tables = monthly_tables(get_cube(path=path, sheet=sheet), True)
+    return {group: MonthlyView(table, monthly_trends(table)) for group, table in tables.items()}
+
+
+# ---------- página 4 ----------
+class AnnualView(NamedTuple):
+    by_filial: pd.DataFrame   # yoy_comparison por Nome Filial
+    by_line: pd.DataFrame     # yoy_comparison por Ajuste Conta
+    chart: dict               # especificação Vega-Lite do comparativo 2017 x 2018 por filial
+
+
+def annual_chart(by_filial: pd.DataFrame) -> dict:
+    """Barras agrupadas 2017 x 2018 por filial (ordem de by_filial), como especificação Vega-Lite."""
+    chart_df = by_filial[["Nome Filial", "Total 2017", "Total 2018"]].melt(id_vars="Nome Filial", var_name="Ano", value_name="Valor")
+    chart = alt.Chart(chart_df).mark_bar().encode(
+        x=alt.X('Nome Filial:N', sort=by_filial["Nome Filial"].tolist(), title='Filial'),
+        y=alt.Y('Valor:Q', title='Valor (R$)'),
+        color='Ano:N',
+        tooltip=[alt.Tooltip('Nome Filial:N'), alt.Tooltip('Ano:N'), alt.Tooltip('Valor:Q', format=',.2f')]
+    ).properties(height=420, width=1000).interactive()
+    return chart.to_dict()
+
+
+@versioned
+def annual_contributions(path, sheet, status=None):
+    """filial_contributions do cubo da versão atual para um status (None = todos)."""
+    return filial_contributions(get_cube(path=path, sheet=sheet), status)
+
+
+# (caminho, aba, status) -> (contribuições, SelectionTotals da última seleção)
+_LAST_SELECTION = {}
+_SELECTION_LOCK = threading.Lock()  # as sessões do Streamlit rodam em threads
+
+
+def _line_totals(path, sheet, status, contrib, selected):
+    with _SELECTION_LOCK:
+        last = _LAST_SELECTION.get((path, sheet, status))
+        if last is None or last[0] is not contrib:  # base nova: recomeça a soma
+            last = (contrib, SelectionTotals(contrib.by_line))
+            _LAST_SELECTION[(path, sheet, status)] = last
+        return line_totals(last[1].update(selected))
+
+
+@versioned(maxsize=FILTER_CACHE_SIZE)
+def annual_view(path, sheet, status=None, filiais=None):
+    """Agregados e gráfico da página 4 para um filtro normalizado; None se o filtro não deixa nenhuma célula."""
+    contrib = annual_contributions(status, path=path, sheet=sheet)
+    present = contrib.by_filial.index.astype(str)
+    selected = contrib.by_filial.index[present.isin(filiais)] if filiais is not None else contrib.by_filial.index
+    if selected.empty:
+        return None
+    by_filial = yoy_table(contrib.by_filial.loc[selected])
+    by_line = yoy_table(_line_totals(path, sheet, status, contrib, selected))
+    return AnnualView(by_filial, by_line, annual_chart(by_filial))
+
+
+# ---------- página 5 ----------
+@versioned
+def efficiency_table(path, sheet):
+    """efficiency_scores do cubo da versão atual (todas as filiais)."""
+    return efficiency_scores(get_cube(path=path, sheet=sheet))
+
+
+class EfficiencyView(NamedTuple):
+    filtered: pd.DataFrame    # filiais selecionadas, em ordem de score
+    top5: pd.DataFrame        # Total_2018 das 5 mais eficientes (crescente, para o gráfico)
+    bottom5: pd.DataFrame     # Total_2018 das 5 menos eficientes (decrescente)
+
+
+@versioned(maxsize=FILTER_CACHE_SIZE)
+def efficiency_view(path, sheet, filiais=None):
+    """Tabela da página 5 restrita às filiais (None = todas) e as bases dos gráficos top/bottom 5."""
+    filtered = efficiency_table(path=path, sheet=sheet)
+    if filiais:
+        filtered = filtered[filtered["Nome Filial"].isin(filiais)]
+    chart = filtered.set_index("Nome Filial")[["Total_2018"]]
+    return EfficiencyView(
+        filtered,
+        chart.head(5).sort_values("Total_2018", ascending=True),
+        chart.tail(5).sort_values("Total_2018", ascending=False),
+    )
+
+
+@versioned
+def efficiency_matrix(path, sheet):
+    """Componentes normalizados do score (filial × componente), base do what-if de pesos."""
+    return efficiency_components(efficiency_table(path=path, sheet=sheet))
+
+
+@versioned(maxsize=FILTER_CACHE_SIZE)
+def weight_stability(path, sheet, weights=EFFICIENCY_WEIGHTS, step=WEIGHT_GRID_STEP):
+    """rank_stability de todas as filiais na grade de pesos com passo `step`."""
+    return rank_stability(efficiency_matrix(path=path, sheet=sheet), weights, weight_grid(step))
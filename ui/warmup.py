@@ -0,0 +1,93 @@
+# ui/warmup.py
+"""Pré-aquecimento, em segundo plano, dos caches compartilhados das páginas.
+
+A Página Inicial chama start_prewarm() ao abrir. Uma thread daemon, uma vez
+por versão da base e por processo, espera a carga da base (a mesma de
+ui.loading, que alimenta as prévias das páginas 1 e 4) e calcula os resultados das
+páginas 1 a 6 com os filtros padrão pelas mesmas funções memorizadas que as
+páginas usam (ui.views, core.analytics). Quem abrir uma seção depois encontra
+tudo pronto; quem abrir antes do fim calcula só o que ainda faltar.
+DASH_PREWARM=0 desliga o pré-aquecimento.
+"""
+import os
+import threading
+import time
+
+from core import profiling
+from core.analytics import EFFICIENCY_WEIGHTS, current_freight_plan
+from core.cube import get_cube
+from core.loader import dataset_version
+from ui import views
+from ui.loading import start_loading
+
+ENV_VAR = "DASH_PREWARM"
+
+
+def _libraries():
+    # importações pesadas das páginas 4 e 6 (altair já vem com ui.views)
+    import plotly.express  # noqa: F401
+
+
+# (etapa, função) na ordem das dependências: base -> cubo -> páginas
+WARM_STEPS = [
+    ("base", lambda: start_loading().wait()),
+    ("cubo", get_cube),
+    ("1 ranking", lambda: views.ranking_table(None)),
+    ("2 representatividade", views.area_view),
+    ("3 mensal", views.monthly_view),
+    ("4 anual", lambda: views.annual_view(None, None)),
+    ("5 eficiência", lambda: (views.efficiency_view(None), views.weight_stability(EFFICIENCY_WEIGHTS))),
+    ("6 plano de ação", current_freight_plan),
+    ("bibliotecas", _libraries),
+]
+
+# versão da base -> {"thread", "status": {"steps": {etapa: segundos}, "error"}}
+_RUNS = {}
+_LOCK = threading.Lock()
+
+
+def enabled() -> bool:
+    return os.environ.get(ENV_VAR) is None or profiling.enabled_by(os.environ.get(ENV_VAR))
+
+
+def prewarm(steps=WARM_STEPS, status: dict = None) -> dict:
+    """Executa as etapas em sequência; devolve {etapa: segundos} (para na primeira falha)."""
+    status = {"steps": {}, "error": None} if status is None else status
+    for name, fn in steps:
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:  # a página mostra o erro quando for aberta
+            status["error"] = f"{name}: {e}"
+            break
+        status["steps"][name] = time.perf_counter() - start
+    return status
+
+
+def start_prewarm():
+    """Dispara o pré-aquecimento da versão atual da base, se ainda não foi feito; devolve a thread ou None."""
+    if not enabled():
+        return None
+    try:
+        version = dataset_version()
+    except OSError:
+        return None
+    with _LOCK:
+        if version in _RUNS:
+            return _RUNS[version]["thread"]
+        status = {"steps": {}, "error": None}
+        thread = threading.Thread(target=prewarm, kwargs={"status": status}, name="prewarm", daemon=True)
+        _RUNS[version] = {"thread": thread, "status": status}
+        thread.start()
+        return thread
+
+
+def prewarm_status() -> dict:
+    """Situação do pré-aquecimento da versão atual: {"steps", "error", "running"} ou {} se não iniciado."""
+    try:
+        run = _RUNS.get(dataset_version())
+    except OSError:
+        return {}
+    if run is None:
+        return {}
+    return {**run["status"], "running": run["thread"].is_alive()}